@@ -1,8 +1,9 @@
+import argparse
+import functools
 import json
 import time
 import sys
 import os
-import glob
 from pathlib import Path
 from datetime import datetime
 
@@ -27,22 +28,43 @@ except ImportError:
 
     Fore = Back = Style = DummyColor()
 
-from modules.LeMistral_client import lemistral_rescue_me, set_csv, get_csv
-from modules.cleaner import lemistral_helper_action
+from modules.LeMistral_client import lemistral_rescue_me, set_csv, get_csv, set_planner, planners, DEFAULT_PLANNER
+from modules.cleaner import lemistral_helper_action, build_operations, resume_cleaning, DEFAULT_BACKEND, backends
+from modules.checkpoint import CheckpointRun, list_unfinished_runs, prune_runs, DEFAULT_CHECKPOINT_EVERY
+from modules.chunked import stream_clean
+from modules.dedup_index import set_index_dir, commit_persistent_indexes, discard_persistent_indexes
 from modules.kody_art import show_cody
+from modules.preview import PreviewAnalysis, PREVIEW_MIN_BYTES
+from modules.rule_engine import set_policy_path, load_policy
+from modules.watcher import FileIndex, DataWatcher, process_file
+from modules import memory_governor
+from modules.memory_governor import plan_run, format_memory_report, set_memory_budget, optimize_memory
+from modules.service import run_server, DEFAULT_PORT, DEFAULT_WORKERS
+from modules.stats_catalog import get_catalog
 
 
 class DataCleanerREPL:
-    def __init__(self):
+    def __init__(self, backend=DEFAULT_BACKEND, chunksize=None, checkpoint_every=DEFAULT_CHECKPOINT_EVERY):
         self.csv_path = None
         self.strategies_json = None
         self.df = None
         self.final_data = None
+        self.streamed_output = None
+        self.preview = None
+        self.backend = backend
+        self.chunksize = chunksize
+        self.cli_chunksize = chunksize
+        self.memory_plan = None
+        self.checkpoint_every = checkpoint_every
+        self.checkpoint_run = None
 
         # Detect project root directory automatically
         self.project_root = self._detect_project_root()
         self.data_dir = os.path.join(self.project_root, "data")
         self.outputs_dir = os.path.join(self.project_root, "outputs")
+        self.checkpoints_dir = os.path.join(self.outputs_dir, ".checkpoints")
+        self.file_index_path = os.path.join(self.outputs_dir, ".file_index.json")
+        self.file_index = FileIndex(self.file_index_path)
 
         # Ensure directories exist
         self._ensure_directories()
@@ -100,7 +122,8 @@ class DataCleanerREPL:
 
         print(f"\n{Fore.YELLOW}📂 Project root:    {Fore.WHITE}{self.project_root}")
         print(f"{Fore.YELLOW}📁 Data directory:  {Fore.WHITE}{self.data_dir}")
-        print(f"{Fore.YELLOW}💾 Output directory: {Fore.GREEN}{self.outputs_dir}{Style.RESET_ALL}\n")
+        print(f"{Fore.YELLOW}💾 Output directory: {Fore.GREEN}{self.outputs_dir}{Style.RESET_ALL}")
+        print(f"{Fore.YELLOW}⚙️  Backend:          {Fore.WHITE}{self.backend}{Style.RESET_ALL}\n")
 
     def show_menu(self):
         """Displays the main menu with colors"""
@@ -117,26 +140,19 @@ class DataCleanerREPL:
         print(f"{Fore.GREEN}7. {Fore.WHITE}💾 Export clean data")
         print(f"{Fore.GREEN}8. {Fore.WHITE}🔄 Reset process")
         print(f"{Fore.GREEN}9. {Fore.WHITE}❓ Help")
+        print(f"{Fore.GREEN}10. {Fore.WHITE}↩️  Undo last cleaning operations")
+        print(f"{Fore.GREEN}11. {Fore.WHITE}⏯️  Resume interrupted cleaning")
         print(f"{Fore.RED}0. {Fore.WHITE}👋 Exit")
 
         print(Fore.MAGENTA + Style.BRIGHT + "─" * 70 + Style.RESET_ALL)
 
     def find_csv_files(self):
-        """Searches for CSV files in the data/ directory"""
-        csv_files = []
+        """Searches for CSV files in the data/ directory and its subdirectories"""
+        if not os.path.exists(self.data_dir):
+            return []
 
-        # Search in data/ directory
-        if os.path.exists(self.data_dir):
-            csv_files.extend(glob.glob(os.path.join(self.data_dir, "*.csv")))
-
-        # Search in data/ subdirectories
-        if os.path.exists(self.data_dir):
-            csv_files.extend(glob.glob(os.path.join(self.data_dir, "**", "*.csv"), recursive=True))
-
-        # Remove duplicates and sort
-        csv_files = sorted(list(set(csv_files)))
-
-        return csv_files
+        # El índice solo vuelve a listar los directorios que cambiaron
+        return self.file_index.scan(self.data_dir)
 
     def load_csv(self):
         """Loads a CSV file with automatic detection and number selection"""
@@ -165,7 +181,7 @@ class DataCleanerREPL:
 
         for i, csv_file in enumerate(csv_files, 1):
             # Display file information
-            file_size = os.path.getsize(csv_file) / 1024  # KB
+            file_size = self.file_index.size(csv_file) / 1024  # KB
             relative_path = os.path.relpath(csv_file, self.project_root)
             print(f"{Fore.GREEN}{i}. {Fore.WHITE}{relative_path} {Fore.YELLOW}({file_size:.1f} KB){Style.RESET_ALL}")
 
@@ -205,16 +221,34 @@ class DataCleanerREPL:
         try:
             set_csv(path)
             self.csv_path = path
+            self._plan_memory()
             # Reset previous data
             self.strategies_json = None
             self.df = None
             self.final_data = None
+            self.streamed_output = None
+            self.preview = None
 
             relative_path = os.path.relpath(path, self.project_root)
             print(f"{Fore.GREEN}✓ File loaded successfully: {Fore.CYAN}{relative_path}{Style.RESET_ALL}")
         except Exception as e:
             print(f"{Fore.RED}✗ Error loading file: {e}{Style.RESET_ALL}")
 
+    def _plan_memory(self):
+        """Projects the memory use of the loaded file and switches to chunked mode if it exceeds the budget"""
+        self.chunksize = self.cli_chunksize
+        self.memory_plan = plan_run(self.csv_path)
+
+        projected_mb = self.memory_plan['projected_bytes'] / 1024 ** 2
+        budget_mb = self.memory_plan['budget_bytes'] / 1024 ** 2
+        print(f"{Fore.YELLOW}🧠 Projected memory: {Fore.WHITE}{projected_mb:.1f} MB "
+              f"(budget {budget_mb:.0f} MB){Style.RESET_ALL}")
+
+        if self.memory_plan['chunked'] and not self.chunksize:
+            self.chunksize = self.memory_plan['chunksize']
+            print(f"{Fore.YELLOW}⚠️  Over the memory budget: switching to chunked processing "
+                  f"({self.chunksize} rows per chunk){Style.RESET_ALL}")
+
     def analyze_data(self):
         """Analyzes data and generates strategies"""
         if not self.csv_path:
@@ -227,13 +261,94 @@ class DataCleanerREPL:
         relative_path = os.path.relpath(self.csv_path, self.project_root)
         print(f"{Fore.YELLOW}    File: {Fore.WHITE}{relative_path}{Style.RESET_ALL}")
 
+        over_budget = self.memory_plan is not None and self.memory_plan['chunked']
+        if over_budget or os.path.getsize(self.csv_path) >= PREVIEW_MIN_BYTES:
+            self._analyze_with_preview(run_full=not over_budget)
+            return
+
         try:
             self.strategies_json, self.df = lemistral_rescue_me()
             print(
                 f"\n{Fore.GREEN}✓ Analysis completed. Found {Fore.YELLOW}{len(self.strategies_json)}{Fore.GREEN} problem(s).{Style.RESET_ALL}")
+            self._show_memory_report()
         except Exception as e:
             print(f"{Fore.RED}✗ Error analyzing data: {e}{Style.RESET_ALL}")
 
+    def _show_memory_report(self):
+        """Prints per-column memory before and after downcasting"""
+        report = memory_governor.last_memory_report
+        if not report:
+            return
+        lines = format_memory_report(report)
+        print(f"\n{Fore.CYAN}🧠 {lines[0]}{Style.RESET_ALL}")
+        for line in lines[1:]:
+            print(f"   {Fore.WHITE}{line}{Style.RESET_ALL}")
+
+    def _analyze_with_preview(self, run_full=True):
+        """Shows a sample-based preview now and keeps the exact analysis running in background"""
+        if run_full:
+            print(f"{Fore.YELLOW}    Large file: showing a sample preview while the full analysis runs{Style.RESET_ALL}")
+        else:
+            print(f"{Fore.YELLOW}    Over the memory budget: analyzing a sample only{Style.RESET_ALL}")
+
+        try:
+            self.preview = PreviewAnalysis(self.csv_path)
+            preview = self.preview.start(run_full=run_full)
+        except Exception as e:
+            print(f"{Fore.RED}✗ Error analyzing data: {e}{Style.RESET_ALL}")
+            return
+
+        self.strategies_json = preview['strategies']
+        self.df = None
+
+        print(f"\n{Fore.CYAN}⚡ PREVIEW: {Fore.WHITE}{preview['sample_rows']} sampled rows "
+              f"of ~{preview['estimated_rows']} (95% bounds){Style.RESET_ALL}")
+        for col, (rate, lower, upper) in preview['metrics']['null_rate'].items():
+            if rate > 0:
+                print(f"   {Fore.YELLOW}{col}: {Fore.WHITE}{rate:.2%} nulls [{lower:.2%}, {upper:.2%}]{Style.RESET_ALL}")
+        for col, (rate, lower, upper) in preview['metrics']['outlier_rate'].items():
+            if rate > 0:
+                print(f"   {Fore.YELLOW}{col}: {Fore.WHITE}{rate:.2%} outliers [{lower:.2%}, {upper:.2%}]{Style.RESET_ALL}")
+
+        if self.strategies_json:
+            print(
+                f"\n{Fore.GREEN}✓ Preview completed. Found {Fore.YELLOW}{len(self.strategies_json)}{Fore.GREEN} problem(s).{Style.RESET_ALL}")
+        elif self.preview.error:
+            print(f"{Fore.RED}✗ {self.preview.error}{Style.RESET_ALL}")
+
+        if not run_full:
+            self.preview = None
+            return
+        print(f"{Fore.CYAN}⏳ Full analysis running in background...{Style.RESET_ALL}")
+
+    def _check_preview(self, wait=False):
+        """Swaps in the full analysis once it finishes and reports where it disagrees with the preview"""
+        if self.preview is None:
+            return
+        if wait and not self.preview.done:
+            print(f"{Fore.CYAN}⏳ Waiting for the full analysis to finish...{Style.RESET_ALL}")
+            self.preview.wait()
+        if not self.preview.done:
+            return
+
+        preview, self.preview = self.preview, None
+        if preview.full is None:
+            print(f"\n{Fore.RED}✗ {preview.error}{Style.RESET_ALL}")
+            return
+
+        self.df = preview.full_df
+        if preview.full['strategies'] is not None:
+            self.strategies_json = preview.full['strategies']
+
+        print(f"\n{Fore.GREEN}✓ Full analysis finished.{Style.RESET_ALL}")
+        self._show_memory_report()
+        if preview.disagreements:
+            print(f"{Fore.YELLOW}⚠️  The full results differ from the preview:{Style.RESET_ALL}")
+            for disagreement in preview.disagreements:
+                print(f"   {Fore.WHITE}• {disagreement}{Style.RESET_ALL}")
+        else:
+            print(f"{Fore.GREEN}   Preview and full results agree.{Style.RESET_ALL}")
+
     def show_strategies(self):
         """Displays cleaning strategies"""
         if not self.strategies_json:
@@ -254,16 +369,132 @@ class DataCleanerREPL:
 
     def apply_cleaning(self):
         """Applies cleaning strategies"""
-        if not self.strategies_json or self.df is None:
+        self._check_preview(wait=True)
+        # En modo por chunks el DataFrame completo no hace falta
+        if not self.strategies_json or (self.df is None and not self.chunksize):
             print(f"\n{Fore.RED}✗ You must first analyze the data (option 2){Style.RESET_ALL}")
             return
 
         print(f"\n{Fore.CYAN}{'─' * 70}{Style.RESET_ALL}")
         print(f"{Fore.CYAN}🧹 Applying cleaning strategies...{Style.RESET_ALL}")
 
+        # Cada aplicación vuelve a empezar las claves pendientes del índice de duplicados
+        discard_persistent_indexes()
+
+        if self.chunksize:
+            self._stream_cleaning()
+            return
+
         try:
-            self.final_data = lemistral_helper_action(self.strategies_json, self.df)
+            checkpoint = self._start_checkpoint_run()
+            self.final_data = lemistral_helper_action(self.strategies_json, self.df, backend=self.backend,
+                                                      checkpoint=checkpoint)
             print(f"{Fore.GREEN}✓ Cleaning applied successfully{Style.RESET_ALL}")
+            # Las conversiones de tipo dejan columnas numéricas nuevas que se pueden reducir
+            self.final_data = optimize_memory(self.final_data)
+            self._show_memory_report()
+        except Exception as e:
+            print(f"{Fore.RED}✗ Error applying cleaning: {e}{Style.RESET_ALL}")
+
+    def _start_checkpoint_run(self):
+        """Creates the checkpoint run for the next apply (pandas backend only)"""
+        if self.checkpoint_run is not None and self.checkpoint_run.manifest['finished']:
+            self.checkpoint_run.delete()
+        self.checkpoint_run = None
+
+        if not self.checkpoint_every or self.backend != "pandas":
+            return None
+
+        try:
+            self.checkpoint_run = CheckpointRun.create(self.checkpoints_dir, self.csv_path, self.strategies_json,
+                                                       build_operations(self.strategies_json), self.df,
+                                                       every=self.checkpoint_every)
+        except Exception as e:
+            # Sin checkpoints no hay deshacer ni reanudar, pero la limpieza sigue
+            print(f"{Fore.YELLOW}⚠️ Checkpoints disabled for this run: {e}{Style.RESET_ALL}")
+        return self.checkpoint_run
+
+    def undo_operations(self):
+        """Restores the clean data as it was N operations ago, from checkpoints"""
+        run = self.checkpoint_run
+        if run is None or self.final_data is None:
+            print(f"\n{Fore.RED}✗ No checkpointed cleaning to undo (apply cleaning first, option 4){Style.RESET_ALL}")
+            return
+
+        operations = run.operations
+        print(f"\n{Fore.CYAN}Applied operations: {Fore.YELLOW}{run.completed}{Style.RESET_ALL}")
+        for i, (strategy_name, column) in enumerate(operations[:run.completed], 1):
+            print(f"   {Fore.WHITE}{i}. {strategy_name} → {column}{Style.RESET_ALL}")
+
+        try:
+            count = int(input(f"\n{Fore.CYAN}How many operations to undo? {Style.RESET_ALL}").strip())
+        except ValueError:
+            print(f"{Fore.RED}✗ Invalid input. Enter a number.{Style.RESET_ALL}")
+            return
+        if count <= 0:
+            return
+
+        try:
+            df, reached = run.restore(max(0, run.completed - count))
+            run.truncate(reached)
+            self.final_data = df
+            print(f"{Fore.GREEN}✓ Restored state after {reached} operation(s){Style.RESET_ALL}")
+            print(f"{Fore.CYAN}   Use option 11 to re-apply the remaining operations{Style.RESET_ALL}")
+        except Exception as e:
+            print(f"{Fore.RED}✗ Error restoring checkpoint: {e}{Style.RESET_ALL}")
+
+    def resume_run(self):
+        """Continues an interrupted (or undone) cleaning run from its last checkpoint"""
+        runs = list_unfinished_runs(self.checkpoints_dir)
+        if not runs:
+            print(f"\n{Fore.YELLOW}⚠️  No interrupted cleaning runs found{Style.RESET_ALL}")
+            return
+
+        print(f"\n{Fore.CYAN}⏯️  Interrupted runs:{Style.RESET_ALL}")
+        for i, run in enumerate(runs, 1):
+            print(f"{Fore.GREEN}{i}. {Fore.WHITE}{os.path.basename(run.run_dir)} "
+                  f"{Fore.YELLOW}({run.completed}/{len(run.operations)} operations){Style.RESET_ALL}")
+
+        try:
+            choice = int(input(f"\n{Fore.CYAN}Select a run (number, 0 to cancel): {Style.RESET_ALL}").strip())
+        except ValueError:
+            print(f"{Fore.RED}✗ Invalid input. Enter a number.{Style.RESET_ALL}")
+            return
+        if not 1 <= choice <= len(runs):
+            return
+
+        run = runs[choice - 1]
+        try:
+            self.final_data = resume_cleaning(run)
+            self.checkpoint_run = run
+            self.csv_path = run.manifest['csv_path']
+            set_csv(self.csv_path)
+            self.strategies_json = run.manifest['strategies']
+            self.df, _ = run.restore(0)
+            self.streamed_output = None
+            print(f"{Fore.GREEN}✓ Cleaning resumed and completed{Style.RESET_ALL}")
+        except Exception as e:
+            print(f"{Fore.RED}✗ Error resuming cleaning: {e}{Style.RESET_ALL}")
+
+    def _stream_cleaning(self):
+        """Applies the strategies chunk by chunk and writes straight to the output file"""
+        print(f"{Fore.YELLOW}    Streaming mode: {Fore.WHITE}{self.chunksize} rows per chunk{Style.RESET_ALL}")
+
+        path = self._ask_output_path()
+        if path is None:
+            return
+
+        try:
+            rows, columns = stream_clean(self.csv_path, build_operations(self.strategies_json), path,
+                                         chunksize=self.chunksize)
+            self.streamed_output = path
+            file_size = os.path.getsize(path) / 1024  # KB
+            relative_path = os.path.relpath(path, self.project_root)
+
+            print(f"\n{Fore.GREEN}✓ Cleaning applied and exported successfully{Style.RESET_ALL}")
+            print(f"{Fore.CYAN}📁 Location: {Fore.WHITE}{relative_path}{Style.RESET_ALL}")
+            print(f"{Fore.CYAN}📊 Dimensions: {Fore.WHITE}{rows} rows × {columns} columns{Style.RESET_ALL}")
+            print(f"{Fore.CYAN}💾 Size: {Fore.WHITE}{file_size:.1f} KB{Style.RESET_ALL}")
         except Exception as e:
             print(f"{Fore.RED}✗ Error applying cleaning: {e}{Style.RESET_ALL}")
 
@@ -287,7 +518,7 @@ class DataCleanerREPL:
         print(self.final_data.info())
 
         print(f"\n{Fore.CYAN}Descriptive Statistics:{Style.RESET_ALL}")
-        print(self.final_data.describe())
+        print(get_catalog(self.final_data).describe())
 
     def compare_data(self):
         """Compares original vs clean data"""
@@ -305,7 +536,7 @@ class DataCleanerREPL:
             f"   {Fore.YELLOW}Dimensions: {Fore.WHITE}{self.df.shape[0]} rows × {self.df.shape[1]} columns{Style.RESET_ALL}")
         print(f"   {Fore.YELLOW}Null values per column:{Style.RESET_ALL}")
 
-        null_counts = self.df.isnull().sum()
+        null_counts = get_catalog(self.df).null_counts()
         has_nulls = False
         for col, count in null_counts.items():
             if count > 0:
@@ -321,7 +552,7 @@ class DataCleanerREPL:
             f"   {Fore.YELLOW}Dimensions: {Fore.WHITE}{self.final_data.shape[0]} rows × {self.final_data.shape[1]} columns{Style.RESET_ALL}")
         print(f"   {Fore.YELLOW}Null values per column:{Style.RESET_ALL}")
 
-        null_counts_clean = self.final_data.isnull().sum()
+        null_counts_clean = get_catalog(self.final_data).null_counts()
         has_nulls_clean = False
         for col, count in null_counts_clean.items():
             if count > 0:
@@ -340,12 +571,8 @@ class DataCleanerREPL:
         print(
             f"{Fore.GREEN}📈 Rows retained: {Fore.WHITE}{self.final_data.shape[0]} ({percentage:.2f}%){Style.RESET_ALL}")
 
-    def export_data(self):
-        """Exports clean data to the outputs directory"""
-        if self.final_data is None:
-            print(f"\n{Fore.RED}✗ You must first apply cleaning (option 4){Style.RESET_ALL}")
-            return
-
+    def _default_output_path(self):
+        """Builds the suggested output path in the outputs directory"""
         # Generate timestamp for unique filename
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
 
@@ -358,10 +585,12 @@ class DataCleanerREPL:
             suggested_name = f"clean_data_{timestamp}.csv"
 
         # Default path in outputs directory
-        default_path = os.path.join(self.outputs_dir, suggested_name)
+        return os.path.join(self.outputs_dir, suggested_name)
+
+    def _ask_output_path(self):
+        """Asks for the output path and creates its directory. Returns None on error"""
+        default_path = self._default_output_path()
 
-        print(f"\n{Fore.CYAN}{'─' * 70}{Style.RESET_ALL}")
-        print(f"{Fore.CYAN}💾 Export clean data{Style.RESET_ALL}")
         print(
             f"{Fore.YELLOW}   Suggested path: {Fore.GREEN}{os.path.relpath(default_path, self.project_root)}{Style.RESET_ALL}")
 
@@ -377,10 +606,31 @@ class DataCleanerREPL:
                 print(f"{Fore.GREEN}✓ Directory created: {output_dir}{Style.RESET_ALL}")
             except Exception as e:
                 print(f"{Fore.RED}✗ Error creating directory: {e}{Style.RESET_ALL}")
-                return
+                return None
+
+        return path
+
+    def export_data(self):
+        """Exports clean data to the outputs directory"""
+        if self.streamed_output:
+            relative_path = os.path.relpath(self.streamed_output, self.project_root)
+            print(f"\n{Fore.GREEN}✓ Streaming mode already wrote the clean data to: {Fore.CYAN}{relative_path}{Style.RESET_ALL}")
+            return
+
+        if self.final_data is None:
+            print(f"\n{Fore.RED}✗ You must first apply cleaning (option 4){Style.RESET_ALL}")
+            return
+
+        print(f"\n{Fore.CYAN}{'─' * 70}{Style.RESET_ALL}")
+        print(f"{Fore.CYAN}💾 Export clean data{Style.RESET_ALL}")
+
+        path = self._ask_output_path()
+        if path is None:
+            return
 
         try:
             self.final_data.to_csv(path, index=False)
+            commit_persistent_indexes()
             file_size = os.path.getsize(path) / 1024  # KB
             relative_path = os.path.relpath(path, self.project_root)
 
@@ -406,6 +656,10 @@ class DataCleanerREPL:
             self.strategies_json = None
             self.df = None
             self.final_data = None
+            self.streamed_output = None
+            self.preview = None
+            self.memory_plan = None
+            self.chunksize = self.cli_chunksize
             print(f"{Fore.GREEN}✓ Process reset successfully{Style.RESET_ALL}")
         else:
             print(f"{Fore.CYAN}Reset cancelled{Style.RESET_ALL}")
@@ -424,7 +678,8 @@ class DataCleanerREPL:
 
 {Fore.GREEN}2. Analyze data (option 2){Style.RESET_ALL}
    {Fore.WHITE}• System will automatically detect problems
-   • Generate cleaning strategies using AI{Style.RESET_ALL}
+   • Generate cleaning strategies with the local rules
+   • Only ambiguous columns are sent to the AI (--planner mistral asks it for everything){Style.RESET_ALL}
 
 {Fore.GREEN}3. View strategies (option 3){Style.RESET_ALL}
    {Fore.WHITE}• Review proposed strategies before applying them
@@ -451,6 +706,14 @@ class DataCleanerREPL:
    {Fore.WHITE}• Start over with a different file
    • Clears current session data{Style.RESET_ALL}
 
+{Fore.GREEN}10. Undo (option 10){Style.RESET_ALL}
+   {Fore.WHITE}• Go back N cleaning operations using the saved checkpoints
+   • Nothing is recomputed from the original file{Style.RESET_ALL}
+
+{Fore.GREEN}11. Resume (option 11){Style.RESET_ALL}
+   {Fore.WHITE}• Continue a cleaning run that was interrupted or undone
+   • Picks up from its last checkpoint, without calling the AI again{Style.RESET_ALL}
+
 {Fore.YELLOW}{'─' * 70}{Style.RESET_ALL}
 {Fore.CYAN}COMPLETE WORKFLOW:{Style.RESET_ALL}
   {Fore.WHITE}1 → 2 → 3 → 4 → 5 or 6 → 7{Style.RESET_ALL}
@@ -468,6 +731,8 @@ class DataCleanerREPL:
     def run(self):
         """Runs the REPL"""
         self.show_banner()
+        # Las ejecuciones terminadas de sesiones anteriores ya no se pueden deshacer desde aquí
+        prune_runs(self.checkpoints_dir)
 
         # Display available CSV files at startup
         csv_files = self.find_csv_files()
@@ -479,6 +744,7 @@ class DataCleanerREPL:
             print(f"{Fore.CYAN}   You can still load files manually (option 1){Style.RESET_ALL}")
 
         while True:
+            self._check_preview()
             self.show_menu()
             choice = input(f"\n{Fore.CYAN}Select an option: {Style.RESET_ALL}").strip()
 
@@ -500,7 +766,13 @@ class DataCleanerREPL:
                 self.reset()
             elif choice == '9':
                 self.show_help()
+            elif choice == '10':
+                self.undo_operations()
+            elif choice == '11':
+                self.resume_run()
             elif choice == '0':
+                if self.checkpoint_run is not None and self.checkpoint_run.manifest['finished']:
+                    self.checkpoint_run.delete()
                 print(f"\n{Fore.CYAN}{'═' * 70}")
                 print(f"{Fore.GREEN}👋 Thanks for using Data Cleaner! See you later!")
                 print(f"{Fore.CYAN}{'═' * 70}{Style.RESET_ALL}\n")
@@ -512,5 +784,51 @@ class DataCleanerREPL:
 
 
 if __name__ == "__main__":
-    repl = DataCleanerREPL()
-    repl.run()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Interactive data cleaner")
+    parser.add_argument("--backend", choices=list(backends), default=DEFAULT_BACKEND,
+                        help="DataFrame engine used to apply the cleaning strategies")
+    parser.add_argument("--chunksize", type=int, default=None,
+                        help="Apply and export out-of-core, reading this many rows per chunk")
+    parser.add_argument("--dedup-index", default=None, metavar="DIR",
+                        help="Persistent duplicate-key index: duplicates are also removed across exported files")
+    parser.add_argument("--serve", action="store_true",
+                        help="Run as a local HTTP service instead of the REPL (see modules/service_client.py)")
+    parser.add_argument("--watch", action="store_true",
+                        help="Watch data/ and clean new or changed CSV files automatically")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS)
+    parser.add_argument("--checkpoint-every", type=int, default=DEFAULT_CHECKPOINT_EVERY, metavar="N",
+                        help="Checkpoint the cleaning state every N operations (0 disables undo/resume)")
+    parser.add_argument("--planner", choices=planners, default=DEFAULT_PLANNER,
+                        help="rules: local rule engine, escalating ambiguous columns to Mistral; mistral: always ask Mistral")
+    parser.add_argument("--policy", default=None, metavar="FILE",
+                        help="JSON policy for the rule engine (defaults to kody_policy.json)")
+    parser.add_argument("--memory-budget", type=int, default=None, metavar="MB",
+                        help="Memory budget; files projected above it are processed in chunks")
+    args = parser.parse_args()
+
+    if args.memory_budget:
+        set_memory_budget(args.memory_budget)
+    if args.dedup_index:
+        set_index_dir(args.dedup_index)
+    set_planner(args.planner)
+    if args.policy:
+        if not os.path.exists(args.policy):
+            parser.error(f"policy file not found: {args.policy}")
+        set_policy_path(args.policy)
+        # Validamos la política al arrancar y no en el primer análisis
+        try:
+            load_policy()
+        except ValueError as e:
+            parser.error(str(e))
+
+    repl = DataCleanerREPL(backend=args.backend, chunksize=args.chunksize,
+                           checkpoint_every=args.checkpoint_every)
+    if args.serve:
+        run_server(repl.outputs_dir, repl.data_dir, port=args.port, workers=args.workers)
+    elif args.watch:
+        watcher = DataWatcher(repl.data_dir, repl.outputs_dir, repl.file_index,
+                              process_fn=functools.partial(process_file, backend=args.backend))
+        watcher.run()
+    else:
+        repl.run()
\ No newline at end of file
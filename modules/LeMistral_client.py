@@ -2,6 +2,7 @@ import requests
 import json
 import os
 from modules.detector import detect
+from modules.rule_engine import generate_strategies, escalation_report, get_policy
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -42,6 +43,14 @@ available_strategies = {
 
 csv = ''
 
+# Planificador por defecto: "rules" (motor de reglas local, Mistral solo para columnas ambiguas) o "mistral"
+planners = ("rules", "mistral")
+DEFAULT_PLANNER = os.getenv("KODY_PLANNER", "rules")
+planner = DEFAULT_PLANNER
+
+# Sesión compartida: reutiliza la conexión HTTP con Mistral entre llamadas
+session = requests.Session()
+
 def get_csv():
     return csv
 
@@ -49,64 +58,106 @@ def set_csv(csv_set):
     global csv
     csv = csv_set
 
+def set_planner(name):
+    global planner
+    if name not in planners:
+        raise ValueError(f"Unknown planner '{name}'. Available: {', '.join(planners)}")
+    planner = name
+
 def lemistral_rescue_me(mode="concise"):
     try:
         detect_report,df= detect(get_csv())
-        max_report_length = 3000  # Reducido
-        if len(detect_report) > max_report_length:
-            detect_report = detect_report[:max_report_length] + "..."
-
-        url = "https://api.mistral.ai/v1/chat/completions"
-        headers = {
-            "Authorization": f"Bearer {os.getenv('MISTRAL_API_KEY')}",
-            "Content-Type": "application/json"
-        }
-
-        # Diferentes estilos de prompt
-        prompts = {
-            "concise": "Be brief. List only top 3 critical issues.",
-            "detailed": "Provide comprehensive analysis with examples.",
-            "simple": "Use simple strategies. Avoid complex parameters."
-        }
-
-        payload = {
-            "model": "mistral-large-latest",  # Cambiado a small
-            "temperature": 0.5,  # Menos aleatorio
-            "max_tokens": 1500,  # Limitado
-            "messages": [
-                {
-                    "role": "user",
-                    "content": f"""
-                    Data cleaning expert task. {prompts.get(mode, prompts['concise'])}
-
-                    Problems: {detect_report}
-                    Available: {available_strategies}
-                    focus on the top 5 issues 
-                    JSON format only:
-                    {{"strategies": [{{"column": "", "problem": "", "strategy": "", "parameters": {{}}, "reason": ""}}]}}
-                    """
-                }
-            ]
-        }
-
-        response = requests.post(url, headers=headers, json=payload, timeout=30)
-        response.raise_for_status()
-        result =  response.json()
-        # EXTRAER SOLO LAS ESTRATEGIAS LIMPIAS
-        content = result['choices'][0]['message']['content']
-
-        # Remover markdown code blocks (```json y ```)
-        content = content.replace('```json', '').replace('```', '').strip()
-
-        # Remover saltos de línea y espacios extra
-        content = content.replace('\n', '').replace('  ', ' ')
-
-        # Parsear JSON
-        strategies_data = json.loads(content)
-
-        # Retornar solo las estrategias
-        return strategies_data['strategies'] , df
+        return get_strategies(detect_report, mode) , df
 
     except Exception as e:
         print(f"Error: {e}")
-        return None
\ No newline at end of file
+        return None
+
+
+def request_strategies(detect_report, mode="concise"):
+    """Sends a detection report to Mistral and returns the list of strategies"""
+    max_report_length = 3000  # Reducido
+    if len(detect_report) > max_report_length:
+        detect_report = detect_report[:max_report_length] + "..."
+
+    url = "https://api.mistral.ai/v1/chat/completions"
+    headers = {
+        "Authorization": f"Bearer {os.getenv('MISTRAL_API_KEY')}",
+        "Content-Type": "application/json"
+    }
+
+    # Diferentes estilos de prompt
+    prompts = {
+        "concise": "Be brief. List only top 3 critical issues.",
+        "detailed": "Provide comprehensive analysis with examples.",
+        "simple": "Use simple strategies. Avoid complex parameters."
+    }
+
+    payload = {
+        "model": "mistral-large-latest",  # Cambiado a small
+        "temperature": 0.5,  # Menos aleatorio
+        "max_tokens": 1500,  # Limitado
+        "messages": [
+            {
+                "role": "user",
+                "content": f"""
+                Data cleaning expert task. {prompts.get(mode, prompts['concise'])}
+
+                Problems: {detect_report}
+                Available: {available_strategies}
+                focus on the top 5 issues 
+                JSON format only:
+                {{"strategies": [{{"column": "", "problem": "", "strategy": "", "parameters": {{}}, "reason": ""}}]}}
+                """
+            }
+        ]
+    }
+
+    response = session.post(url, headers=headers, json=payload, timeout=30)
+    response.raise_for_status()
+    result =  response.json()
+    # EXTRAER SOLO LAS ESTRATEGIAS LIMPIAS
+    content = result['choices'][0]['message']['content']
+
+    # Remover markdown code blocks (```json y ```)
+    content = content.replace('```json', '').replace('```', '').strip()
+
+    # Remover saltos de línea y espacios extra
+    content = content.replace('\n', '').replace('  ', ' ')
+
+    # Parsear JSON
+    strategies_data = json.loads(content)
+
+    # Retornar solo las estrategias
+    return strategies_data['strategies']
+
+
+def get_strategies(detect_report, mode="concise"):
+    """
+    Returns the cleaning strategies for a detection report using the configured planner
+
+    With the "rules" planner the plan comes from the local rule engine; only
+    the columns it marks as ambiguous are sent to Mistral, and if that request
+    fails the rule-based plan is returned on its own.
+    """
+    if planner == "mistral":
+        return request_strategies(detect_report, mode)
+
+    policy = get_policy()
+    strategies, ambiguous = generate_strategies(detect_report, policy)
+    if not ambiguous or not policy['escalate_ambiguous']:
+        return strategies
+
+    try:
+        escalated = request_strategies(escalation_report(detect_report, ambiguous), mode)
+    except Exception as e:
+        print(f"Warning: could not ask Mistral about {', '.join(ambiguous)} ({e}); using the rule-based plan")
+        return strategies
+
+    # Mistral decide sobre las columnas ambiguas: sus pasos reemplazan a los de las reglas
+    strategies = [strategy for strategy in strategies if strategy['column'] not in ambiguous]
+    for strategy in escalated:
+        columns = [col.strip() for col in str(strategy.get('column', '')).split(',')]
+        if all(col in ambiguous for col in columns):
+            strategies.append(strategy)
+    return strategies
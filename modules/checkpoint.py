@@ -0,0 +1,227 @@
+import json
+import os
+import shutil
+from datetime import datetime
+
+import pandas as pd
+from tqdm import tqdm
+from modules.chunked import output_columns, ROW_FILTERING_STRATEGIES
+
+# Parquet si pyarrow está disponible; si no, pickle (también binario y rápido)
+try:
+    import pyarrow  # noqa: F401
+    CHECKPOINT_FORMAT = 'parquet'
+except ImportError:
+    CHECKPOINT_FORMAT = 'pickle'
+
+# Cada cuántas operaciones se guarda un checkpoint (0 lo desactiva)
+DEFAULT_CHECKPOINT_EVERY = int(os.getenv("KODY_CHECKPOINT_EVERY", "1"))
+# Ejecuciones interrumpidas que se conservan para reanudar (cada una guarda una copia completa)
+MAX_UNFINISHED_RUNS = 5
+MANIFEST = 'manifest.json'
+
+
+def _write_frame(frame, path_without_ext):
+    if CHECKPOINT_FORMAT == 'parquet':
+        path = path_without_ext + '.parquet'
+        try:
+            frame.to_parquet(path)
+            return os.path.basename(path)
+        except Exception:
+            # Columnas object con tipos mezclados (p. ej. texto relleno con 0) no pasan a Arrow
+            if os.path.exists(path):
+                os.remove(path)
+    path = path_without_ext + '.pkl'
+    frame.to_pickle(path)
+    return os.path.basename(path)
+
+
+def _read_frame(path):
+    if path.endswith('.parquet'):
+        return pd.read_parquet(path)
+    return pd.read_pickle(path)
+
+
+class CheckpointRun:
+    """
+    Checkpoints of one cleaning run, stored under run_dir
+
+    The original frame is saved once; after that each checkpoint stores only
+    the columns changed since the previous one (plus the surviving row index
+    when rows were removed). Any checkpointed state can be rebuilt from those
+    files without re-running transforms, which gives cheap undo and resume.
+    """
+
+    def __init__(self, run_dir, manifest):
+        self.run_dir = run_dir
+        self.manifest = manifest
+        self._dirty_columns = set()
+        self._rows_changed = False
+
+    @classmethod
+    def create(cls, checkpoints_dir, csv_path, strategies_json, operations, df,
+               every=DEFAULT_CHECKPOINT_EVERY):
+        name = os.path.splitext(os.path.basename(csv_path or 'data'))[0]
+        run_dir = os.path.join(checkpoints_dir, f"{name}_{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}")
+        os.makedirs(run_dir)
+
+        try:
+            manifest = {
+                'csv_path': csv_path,
+                'strategies': strategies_json,
+                'operations': [list(operation) for operation in operations],
+                'every': every,
+                'base': _write_frame(df, os.path.join(run_dir, 'base')),
+                'checkpoints': [],
+                'finished': False,
+            }
+            run = cls(run_dir, manifest)
+            run._save_manifest()
+        except Exception:
+            shutil.rmtree(run_dir, ignore_errors=True)
+            raise
+        return run
+
+    @classmethod
+    def load(cls, run_dir):
+        with open(os.path.join(run_dir, MANIFEST), encoding='utf-8') as f:
+            return cls(run_dir, json.load(f))
+
+    def _save_manifest(self):
+        tmp_path = os.path.join(self.run_dir, MANIFEST + '.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.manifest, f, indent=4, default=str)
+        os.replace(tmp_path, os.path.join(self.run_dir, MANIFEST))
+
+    @property
+    def operations(self):
+        return [tuple(operation) for operation in self.manifest['operations']]
+
+    @property
+    def completed(self):
+        """Number of operations covered by the last checkpoint"""
+        checkpoints = self.manifest['checkpoints']
+        return checkpoints[-1]['completed'] if checkpoints else 0
+
+    def record(self, completed, strategy_name, column, df):
+        """Called after each operation; writes a checkpoint every `every` operations"""
+        self._dirty_columns |= output_columns(strategy_name, column)
+        self._rows_changed |= strategy_name in ROW_FILTERING_STRATEGIES
+
+        every = self.manifest['every']
+        if every and (completed % every == 0 or completed == len(self.manifest['operations'])):
+            self.save(completed, df)
+
+    def save(self, completed, df):
+        """
+        Writes a checkpoint; a failed write is reported and never stops the cleaning
+
+        The changes of a failed checkpoint are kept for the next one, so every
+        saved checkpoint can still be restored.
+        """
+        changed = [col for col in df.columns if col in self._dirty_columns]
+        checkpoints = self.manifest['checkpoints']
+        try:
+            file_name = _write_frame(df[changed], os.path.join(self.run_dir, f'step_{completed:04d}'))
+            checkpoints.append({
+                'completed': completed,
+                'file': file_name,
+                'rows_changed': self._rows_changed,
+            })
+            self._save_manifest()
+        except Exception as e:
+            if checkpoints and checkpoints[-1]['completed'] == completed:
+                checkpoints.pop()
+            tqdm.write(f"⚠️ Checkpoint after operation {completed} not saved: {e}")
+            return
+        self._dirty_columns = set()
+        self._rows_changed = False
+
+    def finish(self):
+        self.manifest['finished'] = True
+        try:
+            self._save_manifest()
+        except Exception as e:
+            tqdm.write(f"⚠️ Checkpoint run not marked as finished: {e}")
+
+    def restore(self, completed=None):
+        """
+        Rebuilds the DataFrame as it was after `completed` operations
+
+        Uses the latest checkpoint at or before that point.
+
+        Returns:
+            (DataFrame, number of operations it actually reflects)
+        """
+        if completed is None:
+            completed = self.completed
+
+        df = _read_frame(os.path.join(self.run_dir, self.manifest['base']))
+        reached = 0
+        for checkpoint in self.manifest['checkpoints']:
+            if checkpoint['completed'] > completed:
+                break
+            part = _read_frame(os.path.join(self.run_dir, checkpoint['file']))
+            if checkpoint['rows_changed']:
+                df = df.loc[part.index].copy()
+            for col in part.columns:
+                df[col] = part[col]
+            reached = checkpoint['completed']
+        return df, reached
+
+    def truncate(self, completed):
+        """Drops checkpoints after `completed` operations (used by undo)"""
+        kept = []
+        for checkpoint in self.manifest['checkpoints']:
+            if checkpoint['completed'] <= completed:
+                kept.append(checkpoint)
+            else:
+                os.remove(os.path.join(self.run_dir, checkpoint['file']))
+        self.manifest['checkpoints'] = kept
+        self.manifest['finished'] = False
+        self._save_manifest()
+
+    def delete(self):
+        shutil.rmtree(self.run_dir, ignore_errors=True)
+
+
+def list_unfinished_runs(checkpoints_dir):
+    """Runs that stopped before applying every operation, newest first"""
+    if not os.path.exists(checkpoints_dir):
+        return []
+    runs = []
+    for name in sorted(os.listdir(checkpoints_dir), reverse=True):
+        if os.path.exists(os.path.join(checkpoints_dir, name, MANIFEST)):
+            run = CheckpointRun.load(os.path.join(checkpoints_dir, name))
+            if not run.manifest['finished']:
+                runs.append(run)
+    return runs
+
+
+def prune_runs(checkpoints_dir, keep_unfinished=MAX_UNFINISHED_RUNS):
+    """
+    Deletes finished runs and all but the newest keep_unfinished interrupted ones
+
+    Returns:
+        Number of runs deleted
+    """
+    if not os.path.exists(checkpoints_dir):
+        return 0
+    run_dirs = [os.path.join(checkpoints_dir, name) for name in os.listdir(checkpoints_dir)
+                if os.path.exists(os.path.join(checkpoints_dir, name, MANIFEST))]
+    # Más recientes primero (el nombre empieza por el del CSV, así que se ordena por fecha)
+    run_dirs.sort(key=lambda run_dir: os.path.getmtime(os.path.join(run_dir, MANIFEST)), reverse=True)
+    deleted = 0
+    unfinished = 0
+    for run_dir in run_dirs:
+        try:
+            finished = CheckpointRun.load(run_dir).manifest['finished']
+        except (OSError, ValueError, KeyError):
+            finished = True
+        if not finished:
+            unfinished += 1
+            if unfinished <= keep_unfinished:
+                continue
+        shutil.rmtree(run_dir, ignore_errors=True)
+        deleted += 1
+    return deleted
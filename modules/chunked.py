@@ -0,0 +1,430 @@
+import os
+import numpy as np
+import pandas as pd
+from tqdm import tqdm
+from modules.toolset import *
+from modules.date_parser import SAMPLE_SIZE, format_candidates, has_offsets, infer_formats, parse_dates
+from modules.dedup_index import (DedupIndex, get_persistent_index, commit_persistent_indexes,
+                                 discard_persistent_indexes, hash_keys, null_keys)
+
+DEFAULT_CHUNKSIZE = 50_000
+
+# Estrategias que necesitan estadísticas globales antes de aplicarse por chunk
+FITTED_STRATEGIES = {
+    "fill_with_median",
+    "fill_with_mean",
+    "fill_with_mode",
+    "flag_duplicates",
+    "convert_to_date",
+    "remove_outliers",
+    "winsorize",
+    "get_outliers",
+}
+
+# Estrategias que eliminan filas
+ROW_FILTERING_STRATEGIES = {
+    "remove_null_rows",
+    "remove_duplicates",
+    "remove_outliers",
+    "get_outliers",
+}
+
+# Estrategias sin estado: se aplican igual chunk a chunk
+stateless_strategies = {
+    "fill_with_zero": fill_with_zero,
+    "remove_null_rows": remove_null_rows,
+    "convert_to_lowercase": convert_to_lowercase,
+    "convert_to_uppercase": convert_to_uppercase,
+    "title_case": title_case,
+    "remove_spaces": remove_spaces,
+    "normalize_characters": normalize_characters,
+    "convert_to_numeric_float": convert_to_numeric_float,
+    "convert_to_numeric_int": convert_to_numeric_int,
+    "convert_to_string": convert_to_string,
+}
+
+# Valores distintos que se cuentan de forma exacta por estrategia ajustada; por encima,
+# las medianas y cuantiles pasan a ser aproximados y la moda solo sigue a los más frecuentes
+MAX_TRACKED_VALUES = 100_000
+
+
+def output_columns(strategy_name, column):
+    """Columns written by a strategy"""
+    if strategy_name == "flag_duplicates":
+        return {'es_duplicado'}
+    if strategy_name == "winsorize":
+        return {f'winsorized_{column}'}
+    if strategy_name in ROW_FILTERING_STRATEGIES:
+        return set()
+    return {column}
+
+
+def quantile_from_counts(value_counts, q):
+    """Exact linear-interpolated quantile (same as pandas) from aggregated value counts"""
+    value_counts = value_counts.sort_index()
+    n = value_counts.sum()
+    if n == 0:
+        return np.nan
+    position = (n - 1) * q
+    cumulative = value_counts.to_numpy().cumsum()
+    lower_index = np.searchsorted(cumulative, np.floor(position) + 1)
+    upper_index = np.searchsorted(cumulative, np.ceil(position) + 1)
+    lower = value_counts.index[lower_index]
+    upper = value_counts.index[upper_index]
+    return lower + (upper - lower) * (position - np.floor(position))
+
+
+def _merge_centroids(counts, size):
+    """Merges sorted numeric values into `size` weighted centroids of about equal count"""
+    counts = counts.sort_index()
+    values = counts.index.to_numpy(dtype=float)
+    weights = counts.to_numpy(dtype=float)
+    groups = np.minimum((weights.cumsum() - weights) * size // weights.sum(), size - 1).astype(np.int64)
+    totals = np.bincount(groups, weights=weights)
+    sums = np.bincount(groups, weights=values * weights)
+    keep = totals > 0
+    return pd.Series(totals[keep], index=sums[keep] / totals[keep])
+
+
+def _bound_counts(strategy_name, counts):
+    """Keeps a value_counts accumulator under 2 * MAX_TRACKED_VALUES entries"""
+    if len(counts) <= 2 * MAX_TRACKED_VALUES:
+        return counts
+    if strategy_name == "fill_with_mode":
+        # Solo los valores más frecuentes pueden ser la moda
+        return counts.nlargest(MAX_TRACKED_VALUES)
+    if pd.api.types.is_numeric_dtype(counts.index):
+        return _merge_centroids(counts, MAX_TRACKED_VALUES)
+    return counts
+
+
+def pin_dtypes(csv_path, chunksize=DEFAULT_CHUNKSIZE):
+    """
+    Dtypes to read every chunk with, so all chunks type a column the same way
+
+    pd.read_csv infers each chunk on its own: an int column becomes float in
+    chunks with nulls, and a mostly numeric text column is numeric in chunks
+    without text. This pass reads the file once and pins the columns whose
+    inferred dtype differs between chunks to what a full read would give:
+    float64 for ints and floats, str as soon as any chunk is text.
+
+    Returns:
+        Dict of column → dtype for read_csv
+    """
+    seen = {}
+    for chunk in tqdm(pd.read_csv(csv_path, chunksize=chunksize), desc="🔎 Inferring dtypes", unit="chunk"):
+        for column, dtype in chunk.dtypes.items():
+            seen.setdefault(column, set()).add(dtype)
+
+    pinned = {}
+    for column, dtypes in seen.items():
+        if len(dtypes) == 1:
+            continue
+        if all(pd.api.types.is_numeric_dtype(d) and not pd.api.types.is_bool_dtype(d) for d in dtypes):
+            pinned[column] = 'float64'
+        elif not all(pd.api.types.is_numeric_dtype(d) for d in dtypes):
+            pinned[column] = str
+        # bool con chunks de solo nulos: se deja como lo infiere pandas
+    return pinned
+
+
+def _accumulate(accumulator, strategy_name, series):
+    if strategy_name == "fill_with_mean":
+        total, count = accumulator or (0.0, 0)
+        return total + series.sum(), count + int(series.count())
+
+    if strategy_name == "convert_to_date":
+        # Muestra de valores únicos de todo el archivo, en orden de aparición como en memoria,
+        # para inferir los formatos una sola vez
+        if accumulator is None:
+            accumulator = {'seen': set(), 'sample': [], 'offsets': False}
+        uniques = series.dropna().astype('string').unique()
+        accumulator['offsets'] = accumulator['offsets'] or has_offsets(uniques)
+        if len(accumulator['sample']) < SAMPLE_SIZE:
+            new_values = [value for value in uniques if value not in accumulator['seen']]
+            accumulator['seen'].update(new_values)
+            accumulator['sample'].extend(format_candidates(new_values))
+            if len(accumulator['sample']) >= SAMPLE_SIZE:
+                accumulator['seen'] = set()
+        return accumulator
+
+    if strategy_name == "flag_duplicates":
+        # Las claves van a índices en disco: la memoria no crece con la cardinalidad
+        if accumulator is None:
+            accumulator = {'seen': DedupIndex.temporary(), 'repeats': DedupIndex.temporary(), 'nulls': 0}
+        nulls = series.isna().to_numpy()
+        accumulator['nulls'] += int(nulls.sum())
+        hashes = hash_keys(series[~nulls].to_frame(), [series.name])
+        accumulator['repeats'].stage(accumulator['seen'].repeated_keys(hashes))
+        return accumulator
+
+    counts = series.value_counts()
+    if accumulator is not None:
+        counts = accumulator.add(counts, fill_value=0)
+    return _bound_counts(strategy_name, counts)
+
+
+def _finalize(strategy_name, accumulator):
+    if strategy_name == "fill_with_mean":
+        total, count = accumulator
+        return total / count if count else np.nan
+    if strategy_name == "fill_with_median":
+        return quantile_from_counts(accumulator, 0.5)
+    if strategy_name == "fill_with_mode":
+        if accumulator.empty:
+            return None
+        return accumulator[accumulator == accumulator.max()].index.sort_values()[0]
+    if strategy_name == "convert_to_date":
+        return infer_formats(accumulator['sample'][:SAMPLE_SIZE]), accumulator['offsets']
+    if strategy_name == "flag_duplicates":
+        accumulator['seen'].destroy()
+        # Como duplicated(keep=False), los nulos se marcan si hay más de uno
+        return accumulator['repeats'], accumulator['nulls'] > 1
+    if strategy_name == "winsorize":
+        return quantile_from_counts(accumulator, 0.05), quantile_from_counts(accumulator, 0.95)
+
+    # remove_outliers / get_outliers
+    Q1 = quantile_from_counts(accumulator, 0.25)
+    Q3 = quantile_from_counts(accumulator, 0.75)
+    IQR = Q3 - Q1
+    return Q1 - 1.5 * IQR, Q3 + 1.5 * IQR
+
+
+def _apply_fitted(chunk, strategy_name, column, params):
+    if strategy_name in ("fill_with_median", "fill_with_mean", "fill_with_mode"):
+        chunk[column] = chunk[column].fillna(params)
+        return chunk
+    if strategy_name == "convert_to_date":
+        formats, offsets = params
+        chunk[column], _ = parse_dates(chunk[column], formats=formats)
+        if offsets and chunk[column].dt.tz is None:
+            # Otros chunks tienen offsets: toda la columna queda en UTC
+            chunk[column] = chunk[column].dt.tz_localize('UTC')
+        return chunk
+    if strategy_name == "flag_duplicates":
+        repeats, nulls_repeated = params
+        nulls = chunk[column].isna().to_numpy()
+        flags = nulls & nulls_repeated
+        flags[~nulls] = repeats.contains(hash_keys(chunk[~nulls], [column]))
+        chunk['es_duplicado'] = flags
+        history = get_persistent_index(column)
+        if history is not None:
+            hashes = hash_keys(chunk[~nulls], [column])
+            chunk.loc[~nulls, 'es_duplicado'] |= history.contains(hashes, include_staged=False)
+            history.stage(hashes)
+        return chunk
+    if strategy_name == "winsorize":
+        lower_limit, upper_limit = params
+        chunk[f'winsorized_{column}'] = chunk[column].clip(lower=lower_limit, upper=upper_limit)
+        return chunk
+
+    lower_bound, upper_bound = params
+    if strategy_name == "remove_outliers":
+        return chunk[(chunk[column] >= lower_bound) & (chunk[column] <= upper_bound)].copy()
+    return chunk[(chunk[column] < lower_bound) | (chunk[column] > upper_bound)].copy()
+
+
+def _remove_duplicates(chunk, column, seen):
+    """Keeps rows whose key was not seen in earlier chunks (nor in past files)"""
+    mask = seen.first_seen(chunk, [column], track_nulls=True)
+    history = get_persistent_index(column)
+    if history is not None:
+        keyed = ~null_keys(chunk, [column])
+        mask[keyed] &= ~history.contains(hash_keys(chunk[keyed], [column]), include_staged=False)
+        history.stage(hash_keys(chunk[mask & keyed], [column]))
+    return chunk[mask]
+
+
+def _run_chunk(chunk, operations, params, seen_keys, failed, accumulators=None):
+    """
+    Applies the operations to one chunk
+
+    When accumulators is given (fitting pass), unfitted strategies whose input
+    is already final collect their statistics instead of being applied. An
+    operation that raises is reported, added to `failed` and skipped from
+    then on, like the in-memory cleaner skips it.
+    """
+    dirty_columns = set()
+    rows_dirty = False
+
+    for i, (strategy_name, column) in enumerate(operations):
+        if i in failed or column not in chunk.columns:
+            continue
+
+        try:
+            if strategy_name in FITTED_STRATEGIES and i not in params:
+                if accumulators is not None and not rows_dirty and column not in dirty_columns:
+                    accumulators[i] = _accumulate(accumulators.get(i), strategy_name, chunk[column])
+                dirty_columns |= output_columns(strategy_name, column)
+                rows_dirty |= strategy_name in ROW_FILTERING_STRATEGIES
+                continue
+
+            if strategy_name in FITTED_STRATEGIES:
+                # None: nada que aplicar (p. ej. ajuste fallido o columna sin valores)
+                if params.get(i) is not None:
+                    chunk = _apply_fitted(chunk, strategy_name, column, params[i])
+            elif strategy_name == "remove_duplicates":
+                if i not in seen_keys:
+                    seen_keys[i] = DedupIndex.temporary()
+                chunk = _remove_duplicates(chunk, column, seen_keys[i])
+            else:
+                chunk = stateless_strategies[strategy_name](chunk, column)
+        except Exception as e:
+            tqdm.write(f"❌ Error applying {strategy_name} to {column}: {e}")
+            failed.add(i)
+            if accumulators is not None and i in accumulators:
+                _discard_accumulator(strategy_name, accumulators.pop(i))
+            continue
+
+        if column in dirty_columns:
+            dirty_columns |= output_columns(strategy_name, column)
+            rows_dirty |= strategy_name in ROW_FILTERING_STRATEGIES
+
+    return chunk
+
+
+def _discard_accumulator(strategy_name, accumulator):
+    if strategy_name == "flag_duplicates":
+        accumulator['seen'].destroy()
+        accumulator['repeats'].destroy()
+
+
+def _destroy(seen_keys):
+    for index in seen_keys.values():
+        index.destroy()
+
+
+def _destroy_params(operations, params):
+    for i, fitted in params.items():
+        if operations[i][0] == "flag_duplicates" and fitted is not None:
+            fitted[0].destroy()
+
+
+def fit_plan(csv_path, operations, chunksize=DEFAULT_CHUNKSIZE, failed=None, dtypes=None):
+    """
+    Pre-fits the global fill values and bounds of a strategy plan
+
+    Reads the file chunk by chunk. Strategies that depend on the output of
+    another not-yet-fitted strategy are fitted in a following pass. If an
+    operation fails during a pass, the pass is repeated without it so no
+    statistic is fitted on part of the file. dtypes (see pin_dtypes) are
+    passed to read_csv.
+
+    Returns:
+        Dict mapping operation index to its fitted parameters
+    """
+    failed = set() if failed is None else failed
+    params = {}
+    pending = [i for i, (name, _) in enumerate(operations) if name in FITTED_STRATEGIES]
+    pass_number = 0
+
+    while pending:
+        pass_number += 1
+        known_failures = len(failed)
+        accumulators = {}
+        seen_keys = {}
+        chunks = pd.read_csv(csv_path, chunksize=chunksize, dtype=dtypes)
+        try:
+            for chunk in tqdm(chunks, desc=f"📐 Fitting pass {pass_number}", unit="chunk"):
+                _run_chunk(chunk, operations, params, seen_keys, failed, accumulators)
+                if len(failed) > known_failures:
+                    break
+        finally:
+            _destroy(seen_keys)
+
+        if len(failed) > known_failures:
+            for i, accumulator in accumulators.items():
+                _discard_accumulator(operations[i][0], accumulator)
+            pending = [i for i in pending if i not in failed]
+            continue
+
+        for i, accumulator in accumulators.items():
+            strategy_name, column = operations[i]
+            try:
+                params[i] = _finalize(strategy_name, accumulator)
+            except Exception as e:
+                tqdm.write(f"❌ Error fitting {strategy_name} on {column}: {e}")
+                _discard_accumulator(strategy_name, accumulator)
+                params[i] = None
+        pending = [i for i in pending if i not in params and i not in failed]
+
+        # Columnas inexistentes nunca acumulan: no hay nada que ajustar
+        if not accumulators:
+            break
+
+    return params
+
+
+def _write_chunks(csv_path, operations, params, failed, output_path, chunksize, dtypes):
+    """
+    Cleans every chunk and writes it to output_path
+
+    Returns:
+        (rows written, columns written), or None if an operation failed and
+        the file has to be written again without it
+    """
+    known_failures = len(failed)
+    seen_keys = {}
+    rows_written = 0
+    columns_written = 0
+
+    chunks = pd.read_csv(csv_path, chunksize=chunksize, dtype=dtypes)
+    try:
+        for chunk_number, chunk in enumerate(tqdm(chunks, desc="🧹 Cleaning chunks", unit="chunk")):
+            clean_chunk = _run_chunk(chunk, operations, params, seen_keys, failed)
+            if len(failed) > known_failures:
+                return None
+            clean_chunk.to_csv(output_path, mode='w' if chunk_number == 0 else 'a',
+                               header=chunk_number == 0, index=False)
+            rows_written += len(clean_chunk)
+            columns_written = clean_chunk.shape[1]
+    finally:
+        _destroy(seen_keys)
+    return rows_written, columns_written
+
+
+def stream_clean(csv_path, operations, output_path, chunksize=DEFAULT_CHUNKSIZE):
+    """
+    Applies a strategy plan out-of-core and writes the result chunk by chunk
+
+    The output is written to a temporary file that replaces output_path only
+    when the whole run succeeds. An operation that fails is skipped for the
+    whole file, like the in-memory cleaner does.
+
+    Args:
+        csv_path: Input CSV file
+        operations: List of (strategy_name, column) tuples
+        output_path: CSV file the clean data is written to
+        chunksize: Rows per chunk; peak memory is a few chunks plus at most
+            MAX_TRACKED_VALUES counts per fitted strategy
+
+    Returns:
+        (rows written, columns written)
+    """
+    valid_operations = []
+    for strategy_name, column in operations:
+        if strategy_name not in FITTED_STRATEGIES | set(stateless_strategies) | {"remove_duplicates"}:
+            tqdm.write(f"⚠️ Strategy '{strategy_name}' not found. Skipping...")
+            continue
+        valid_operations.append((strategy_name, column))
+
+    failed = set()
+    dtypes = pin_dtypes(csv_path, chunksize)
+    params = fit_plan(csv_path, valid_operations, chunksize, failed, dtypes)
+    tmp_path = output_path + '.tmp'
+    try:
+        written = None
+        while written is None:
+            written = _write_chunks(csv_path, valid_operations, params, failed, tmp_path, chunksize, dtypes)
+            if written is None:
+                # Una operación falló a mitad del archivo: se reescribe sin ella
+                discard_persistent_indexes()
+        os.replace(tmp_path, output_path)
+    finally:
+        _destroy_params(valid_operations, params)
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+    # Las claves exportadas pasan al historial de deduplicación
+    commit_persistent_indexes()
+    return written
@@ -1,7 +1,11 @@
 import json
+import os
 import time
+import pandas as pd
 from modules.LeMistral_client import lemistral_rescue_me
 from modules.toolset import *
+from modules.date_parser import last_parse_reports, format_report
+from modules.polars_backend import apply_polars
 from tqdm import tqdm
 
 
@@ -40,19 +44,8 @@ strategies_dict = {
 
 
 
-def lemistral_helper_action(strategies_json, df):
-    """
-    Applies cleaning strategies to the DataFrame
-
-    Args:
-        strategies_json: List of strategies from Mistral's JSON
-        df: Pandas DataFrame
-
-    Returns:
-        Clean DataFrame
-    """
-
-    # Preparar todas las operaciones
+def build_operations(strategies_json):
+    """Expands Mistral's strategies into (strategy_name, column) tuples"""
     operations = []
     for strategy in strategies_json:
         strategy_name = strategy.get('strategy', '')
@@ -65,29 +58,124 @@ def lemistral_helper_action(strategies_json, df):
 
         for column in columns:
             operations.append((strategy_name, column))
+    return operations
 
-    # Barra de progreso con tqdm
-    for strategy_name, column in tqdm(operations, desc="🧹 Cleaning data", unit="column"):
 
-        # Verify that the strategy exists
-        if strategy_name not in strategies_dict:
-            tqdm.write(f"⚠️ Strategy '{strategy_name}' not found. Skipping...")
-            continue
+def apply_pandas(operations, df, checkpoint=None, start=0):
+    """
+    Applies cleaning operations one by one with the eager pandas toolset
 
-        # Verify that the column exists in the DataFrame
-        if column not in df.columns:
-            tqdm.write(f"⚠️ Column '{column}' not found. Skipping...")
-            time.sleep(5)
-            continue
+    Args:
+        operations: List of (strategy_name, column) tuples
+        df: Pandas DataFrame
+        checkpoint: Optional CheckpointRun that records the state after each operation
+        start: Number of operations of the run already applied (when resuming)
+    """
+    # Barra de progreso con tqdm
+    for completed, (strategy_name, column) in enumerate(
+            tqdm(operations, desc="🧹 Cleaning data", unit="column"), start=start + 1):
+        df = _apply_operation(df, strategy_name, column)
+        if checkpoint is not None:
+            checkpoint.record(completed, strategy_name, column, df)
+
+    if checkpoint is not None:
+        checkpoint.finish()
+    return df
 
-        try:
-            cleaning_function = strategies_dict[strategy_name]
-            df = cleaning_function(df, column)
-            tqdm.write(f"✓ Applied {strategy_name} to: {column}")
-            time.sleep(5)
-        except Exception as e:
-            tqdm.write(f"❌ Error applying {strategy_name} to {column}: {e}")
+
+def _apply_operation(df, strategy_name, column):
+    # Verify that the strategy exists
+    if strategy_name not in strategies_dict:
+        tqdm.write(f"⚠️ Strategy '{strategy_name}' not found. Skipping...")
+        return df
+
+    # Verify that the column exists in the DataFrame
+    if column not in df.columns:
+        tqdm.write(f"⚠️ Column '{column}' not found. Skipping...")
+        time.sleep(5)
+        return df
+
+    try:
+        cleaning_function = strategies_dict[strategy_name]
+        df = cleaning_function(df, column)
+        tqdm.write(f"✓ Applied {strategy_name} to: {column}")
+        if strategy_name == "convert_to_date" and column in last_parse_reports:
+            tqdm.write(f"   📅 {format_report(last_parse_reports[column])}")
+        time.sleep(5)
+    except Exception as e:
+        tqdm.write(f"❌ Error applying {strategy_name} to {column}: {e}")
 
     return df
 
 
+backends = {
+    "pandas": apply_pandas,
+    "polars": apply_polars,
+}
+
+# Backend por defecto, configurable con la variable de entorno KODY_BACKEND
+DEFAULT_BACKEND = os.getenv("KODY_BACKEND", "pandas")
+
+
+def lemistral_helper_action(strategies_json, df, backend=None, checkpoint=None):
+    """
+    Applies cleaning strategies to the DataFrame
+
+    Args:
+        strategies_json: List of strategies from Mistral's JSON
+        df: Pandas DataFrame
+        backend: Name of the engine to run on ("pandas" or "polars"),
+            defaults to DEFAULT_BACKEND
+        checkpoint: Optional CheckpointRun (pandas backend only, the polars
+            plan runs as a single query)
+
+    Returns:
+        Clean DataFrame
+    """
+    backend = backend or DEFAULT_BACKEND
+    if backend not in backends:
+        raise ValueError(f"Unknown backend '{backend}'. Available: {', '.join(backends)}")
+
+    operations = build_operations(strategies_json)
+    if checkpoint is not None and backend == "pandas":
+        return apply_pandas(operations, df, checkpoint=checkpoint)
+    return backends[backend](operations, df)
+
+
+def resume_cleaning(checkpoint):
+    """
+    Continues an interrupted run from its last checkpoint
+
+    Returns:
+        Clean DataFrame
+    """
+    df, completed = checkpoint.restore()
+    # Descartamos checkpoints parciales posteriores al último estado restaurable
+    checkpoint.truncate(completed)
+    return apply_pandas(checkpoint.operations[completed:], df, checkpoint=checkpoint, start=completed)
+
+
+def check_backend_parity(strategies_json, df, backends_to_compare=("pandas", "polars")):
+    """
+    Runs the same strategies on several backends and checks the outputs match
+
+    Args:
+        strategies_json: List of strategies from Mistral's JSON
+        df: Pandas DataFrame (not modified)
+        backends_to_compare: Backend names; the first one is the reference
+
+    Returns:
+        Dict mapping each backend name to None if identical, or the mismatch message
+    """
+    results = {name: lemistral_helper_action(strategies_json, df.copy(), backend=name)
+               for name in backends_to_compare}
+    reference = results[backends_to_compare[0]]
+
+    report = {}
+    for name, result in results.items():
+        try:
+            pd.testing.assert_frame_equal(reference, result)
+            report[name] = None
+        except AssertionError as e:
+            report[name] = str(e)
+    return report
@@ -0,0 +1,189 @@
+import pandas as pd
+
+# Formatos candidatos, en orden de preferencia cuando empatan; mes primero antes que día
+# primero, como pd.to_datetime, para que '01/02/2023' siga siendo el 2 de enero
+CANDIDATE_FORMATS = [
+    '%Y-%m-%d',
+    '%Y-%m-%d %H:%M:%S',
+    '%Y-%m-%dT%H:%M:%S',
+    '%Y-%m-%dT%H:%M:%S%z',
+    '%Y-%m-%d %H:%M:%S%z',
+    '%Y/%m/%d',
+    '%m/%d/%Y',
+    '%d/%m/%Y',
+    '%m-%d-%Y',
+    '%d-%m-%Y',
+    '%d.%m.%Y',
+    '%Y%m%d',
+    '%d %b %Y',
+    '%b %d, %Y',
+]
+
+ISO_DATE_PATTERN = r'^\d{4}-\d{2}-\d{2}$'
+# Hora seguida de un offset UTC (Z, +02:00, -0500)
+OFFSET_PATTERN = r'\d:\d{2}(?::\d{2}(?:\.\d+)?)?\s*(?:Z|[+-]\d{2}:?\d{2})$'
+SAMPLE_SIZE = 500
+MAX_FORMATS = 3
+
+# Último reporte de parseo por columna, para mostrarlo desde el cleaner
+last_parse_reports = {}
+
+
+def coerce_datetimes(values, fmt):
+    """
+    pd.to_datetime with errors='coerce' that also accepts UTC offsets
+
+    Returns:
+        (naive DatetimeIndex in UTC when any value had an offset, whether any did)
+    """
+    try:
+        parsed = pd.to_datetime(values, format=fmt, errors='coerce')
+    except ValueError:
+        # Offsets distintos en el mismo lote (o mezclados con fechas sin offset)
+        parsed = pd.to_datetime(values, format=fmt, errors='coerce', utc=True)
+    if parsed.tz is None:
+        return parsed, False
+    return parsed.tz_convert('UTC').tz_localize(None), True
+
+
+def infer_formats(values, sample_size=SAMPLE_SIZE, max_formats=MAX_FORMATS):
+    """
+    Infers up to max_formats explicit date formats from a sample of unique strings
+
+    Args:
+        values: Index or array of unique strings
+        sample_size: Number of values to try the candidate formats on
+        max_formats: Maximum number of formats to return
+
+    Returns:
+        List of formats, most useful first
+    """
+    sample = pd.Series(values[:sample_size], dtype=object)
+    sample = sample[sample.str.contains(r'\d', regex=True)]
+    formats = []
+
+    while not sample.empty and len(formats) < max_formats:
+        best_format, best_mask = None, None
+        for fmt in CANDIDATE_FORMATS:
+            if fmt in formats:
+                continue
+            mask = pd.Series(coerce_datetimes(pd.Index(sample), fmt)[0].notna(), index=sample.index)
+            if mask.any() and (best_mask is None or mask.sum() > best_mask.sum()):
+                best_format, best_mask = fmt, mask
+        if best_format is None:
+            break
+        formats.append(best_format)
+        sample = sample[~best_mask]
+
+    return formats
+
+
+def format_candidates(values):
+    """
+    The values parse_dates infers formats from: stripped, and not parsed by the ISO fast path
+
+    Args:
+        values: Unique strings, in order of appearance
+
+    Returns:
+        Index of stripped strings, in the same order
+    """
+    stripped = pd.Index(values, dtype=object).str.strip()
+    iso = stripped.str.match(ISO_DATE_PATTERN, na=False)
+    iso[iso] = pd.to_datetime(stripped[iso], format='%Y-%m-%d', errors='coerce').notna()
+    return stripped[~iso]
+
+
+def has_offsets(values):
+    """True if any string ends with a time and a UTC offset"""
+    return bool(pd.Index(values, dtype=object).str.strip().str.contains(OFFSET_PATTERN, na=False).any())
+
+
+def parse_dates(series, column=None, formats=None):
+    """
+    Converts a series to datetime parsing each unique string only once
+
+    ISO dates take a vectorized fast path; other values are parsed with the
+    formats inferred from a sample (or the given formats, e.g. fitted on the
+    whole file when reading it in chunks), and only leftovers that still look
+    like dates fall back to the slow per-element parser. If any value carries
+    a UTC offset the result is tz-aware UTC.
+
+    Returns:
+        (datetime Series, report dict)
+    """
+    if pd.api.types.is_datetime64_any_dtype(series):
+        report = {'total': int(series.notna().sum()), 'parsed': int(series.notna().sum()),
+                  'parse_rate': 1.0, 'formats': [], 'slow_path_values': 0}
+        if column is not None:
+            last_parse_reports[column] = report
+        return series, report
+
+    codes, uniques = pd.factorize(series.astype('string'))
+    if len(uniques) == 0:
+        # Columna sin valores: todo NaT
+        result = pd.Series(pd.NaT, index=series.index, name=series.name, dtype='datetime64[ns]')
+        report = {'total': 0, 'parsed': 0, 'parse_rate': 1.0, 'formats': [], 'slow_path_values': 0}
+        if column is not None:
+            last_parse_reports[column] = report
+        return result, report
+
+    uniques = pd.Index(uniques.astype(object), dtype=object).str.strip()
+    parsed = pd.Series(pd.NaT, index=range(len(uniques)), dtype='datetime64[ns]')
+    pending = pd.Series(True, index=parsed.index)
+    used_formats = []
+    has_offsets = False
+
+    # Camino rápido: fechas ISO
+    iso_mask = pd.Series(uniques.str.match(ISO_DATE_PATTERN, na=False), index=parsed.index)
+    if iso_mask.any():
+        parsed[iso_mask] = pd.to_datetime(uniques[iso_mask.values], format='%Y-%m-%d', errors='coerce')
+        pending &= parsed.isna()
+        used_formats.append('%Y-%m-%d')
+
+    if pending.any():
+        remaining = uniques[pending.values]
+        for fmt in (infer_formats(remaining) if formats is None else formats):
+            if fmt in used_formats:
+                continue
+            mask = pending & parsed.isna()
+            parsed[mask], offsets = coerce_datetimes(uniques[mask.values], fmt)
+            has_offsets |= offsets
+            pending &= parsed.isna()
+            used_formats.append(fmt)
+
+    # Camino lento: solo valores restantes que contienen dígitos
+    slow_mask = pending & pd.Series(uniques.str.contains(r'\d', regex=True, na=False), index=parsed.index)
+    if slow_mask.any():
+        parsed[slow_mask], offsets = coerce_datetimes(uniques[slow_mask.values], 'mixed')
+        has_offsets |= offsets
+
+    values = parsed.to_numpy()
+    result = pd.Series(values[codes], index=series.index, name=series.name)
+    result[codes == -1] = pd.NaT
+    if has_offsets:
+        # Con offsets la columna queda en UTC; las fechas sin offset se toman como UTC
+        result = result.dt.tz_localize('UTC')
+
+    total = int((codes != -1).sum())
+    parsed_count = int(result.notna().sum())
+    report = {
+        'total': total,
+        'parsed': parsed_count,
+        'parse_rate': round(parsed_count / total, 4) if total else 1.0,
+        'formats': used_formats,
+        'slow_path_values': int(slow_mask.sum()),
+    }
+    if column is not None:
+        last_parse_reports[column] = report
+    return result, report
+
+
+def format_report(report):
+    """One-line human readable summary of a parse report"""
+    text = f"{report['parsed']}/{report['total']} parsed ({report['parse_rate']:.1%})"
+    if report['formats']:
+        text += f", formats: {', '.join(report['formats'])}"
+    if report['slow_path_values']:
+        text += f", {report['slow_path_values']} unique value(s) on slow path"
+    return text
@@ -0,0 +1,241 @@
+import os
+import shutil
+import tempfile
+import numpy as np
+import pandas as pd
+
+DEFAULT_PARTITIONS = 64
+# Hashes en memoria antes de volcar a disco (16 bytes cada uno)
+DEFAULT_SPILL_THRESHOLD = 1_000_000
+
+# Hash de 128 bits como dos uint64: con 64 bits una colisión con el historial borraría una fila
+# real, y la probabilidad crece con cada archivo exportado
+KEY_DTYPE = np.dtype([('hi', '<u8'), ('lo', '<u8')])
+# Semilla del segundo hash (16 caracteres, como pide hash_pandas_object)
+SECOND_HASH_KEY = 'kody-dedup-key-2'
+
+_EMPTY = np.empty(0, dtype=KEY_DTYPE)
+
+
+def _key_text(values):
+    """Key values as strings; integral floats drop the '.0' so 1 and 1.0 match"""
+    text = values.astype('string')
+    if pd.api.types.is_float_dtype(values):
+        # Fuera de ±2**53 un float ya no representa enteros exactos
+        integral = values.notna() & (values == values.round()) & (values.abs() < 2**53)
+        text[integral] = values[integral].astype('int64').astype('string')
+    return text
+
+
+def hash_keys(df, columns):
+    """
+    Hashes the key columns of each row to a stable 128-bit key (KEY_DTYPE)
+
+    Values are compared as strings so a key typed as int in one file and as
+    text or float in another still matches. Both halves are seeded hashes, so
+    they are stable across runs and processes.
+    """
+    keys = pd.DataFrame({column: _key_text(df[column]) for column in columns})
+    hashes = np.empty(len(keys), dtype=KEY_DTYPE)
+    hashes['hi'] = pd.util.hash_pandas_object(keys, index=False).to_numpy(dtype=np.uint64)
+    hashes['lo'] = pd.util.hash_pandas_object(keys, index=False,
+                                              hash_key=SECOND_HASH_KEY).to_numpy(dtype=np.uint64)
+    return hashes
+
+
+def _duplicated(hashes, keep):
+    """Like Series.duplicated for an array of keys (keep='first' or False)"""
+    _, first, inverse, counts = np.unique(hashes, return_index=True, return_inverse=True, return_counts=True)
+    if keep is False:
+        return counts[inverse] > 1
+    duplicated = np.ones(len(hashes), dtype=bool)
+    duplicated[first] = False
+    return duplicated
+
+
+def null_keys(df, columns):
+    """Bool array: True where any key column is missing (those keys never go to the history)"""
+    return df[columns].isna().any(axis=1).to_numpy()
+
+
+class DedupIndex:
+    """
+    Compact on-disk index of key hashes, split into partition files
+
+    Committed hashes are the history (e.g. every exported file). New hashes are
+    staged first: kept in memory and spilled to per-partition files past
+    spill_threshold, so larger-than-RAM inputs can be deduplicated. They only
+    become history after commit().
+    """
+
+    def __init__(self, path, partitions=DEFAULT_PARTITIONS, spill_threshold=DEFAULT_SPILL_THRESHOLD):
+        self.path = path
+        self.partitions = partitions
+        self.spill_threshold = spill_threshold
+        self._staged = {}
+        self._staged_size = 0
+        os.makedirs(path, exist_ok=True)
+
+    @classmethod
+    def temporary(cls, **kwargs):
+        """Index in a temp directory, for deduplicating a single large file"""
+        return cls(tempfile.mkdtemp(prefix='kody_dedup_'), **kwargs)
+
+    def _file(self, kind, partition):
+        return os.path.join(self.path, f'{kind}_{partition:03d}.npy')
+
+    def _load(self, kind, partition):
+        file_path = self._file(kind, partition)
+        if not os.path.exists(file_path):
+            return _EMPTY
+        hashes = np.load(file_path, mmap_mode='r')
+        if hashes.dtype != KEY_DTYPE:
+            raise ValueError(f"{self.path} holds 64-bit key hashes from an older version; "
+                             f"delete it to start a new duplicate history")
+        return hashes
+
+    def _save(self, kind, partition, hashes):
+        file_path = self._file(kind, partition)
+        tmp_path = file_path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            np.save(f, hashes)
+        os.replace(tmp_path, file_path)
+
+    def _partition_of(self, hashes):
+        return (hashes['hi'] % np.uint64(self.partitions)).astype(np.int64)
+
+    def _sorted_contains(self, sorted_hashes, hashes):
+        if len(sorted_hashes) == 0:
+            return np.zeros(len(hashes), dtype=bool)
+        positions = np.searchsorted(sorted_hashes, hashes)
+        positions[positions == len(sorted_hashes)] = 0
+        return np.asarray(sorted_hashes[positions] == hashes)
+
+    def contains(self, hashes, include_staged=True):
+        """Returns a bool array: True where the hash is already in the index"""
+        hashes = np.asarray(hashes, dtype=KEY_DTYPE)
+        found = np.zeros(len(hashes), dtype=bool)
+        partition_ids = self._partition_of(hashes)
+
+        for partition in np.unique(partition_ids):
+            mask = partition_ids == partition
+            part_hashes = hashes[mask]
+            part_found = self._sorted_contains(self._load('part', partition), part_hashes)
+            if include_staged:
+                part_found |= self._sorted_contains(self._load('staged', partition), part_hashes)
+                part_found |= self._sorted_contains(self._staged.get(partition, _EMPTY), part_hashes)
+            found[mask] = part_found
+        return found
+
+    def stage(self, hashes):
+        """Adds hashes as pending; they are visible to contains() but not yet history"""
+        hashes = np.unique(np.asarray(hashes, dtype=KEY_DTYPE))
+        partition_ids = self._partition_of(hashes)
+        for partition in np.unique(partition_ids):
+            staged = self._staged.get(partition, _EMPTY)
+            self._staged[partition] = np.union1d(staged, hashes[partition_ids == partition])
+            self._staged_size += len(self._staged[partition]) - len(staged)
+        if self._staged_size >= self.spill_threshold:
+            self.spill()
+
+    def repeated_keys(self, hashes):
+        """
+        Stages hashes and returns the distinct ones seen more than once
+
+        A hash is repeated if it was already in the index (committed or staged)
+        or appears more than once in this batch.
+        """
+        hashes = np.asarray(hashes, dtype=KEY_DTYPE)
+        repeated = _duplicated(hashes, keep=False) | self.contains(hashes)
+        self.stage(hashes)
+        return np.unique(hashes[repeated])
+
+    def spill(self):
+        """Writes the in-memory staged hashes to their partition files"""
+        for partition, staged in self._staged.items():
+            merged = np.union1d(self._load('staged', partition), staged)
+            self._save('staged', partition, merged)
+        self._staged = {}
+        self._staged_size = 0
+
+    def commit(self):
+        """Moves every staged hash into the persistent history"""
+        self.spill()
+        for partition in range(self.partitions):
+            staged_path = self._file('staged', partition)
+            if not os.path.exists(staged_path):
+                continue
+            merged = np.union1d(self._load('part', partition), self._load('staged', partition))
+            self._save('part', partition, merged)
+            os.remove(staged_path)
+
+    def discard(self):
+        """Drops staged hashes without touching the history"""
+        self._staged = {}
+        self._staged_size = 0
+        for partition in range(self.partitions):
+            staged_path = self._file('staged', partition)
+            if os.path.exists(staged_path):
+                os.remove(staged_path)
+
+    def destroy(self):
+        """Deletes the index directory (for temporary indexes)"""
+        shutil.rmtree(self.path, ignore_errors=True)
+
+    def size(self):
+        """Number of committed hashes"""
+        return sum(len(self._load('part', partition)) for partition in range(self.partitions))
+
+    def first_seen(self, df, columns, include_staged=True, track_nulls=False):
+        """
+        Marks rows whose key is new: not in the index and first within df
+
+        The new keys are staged. With include_staged=True keys staged by earlier
+        batches count as seen (chunked input); with False only the committed
+        history does, so re-running on the same frame gives the same result.
+        Missing keys are deduplicated within df, like drop_duplicates, but are
+        neither staged nor looked up unless track_nulls is set (temporary
+        indexes spanning the chunks of one file).
+        """
+        hashes = hash_keys(df, columns)
+        mask = ~_duplicated(hashes, keep='first')
+        nulls = np.zeros(len(df), dtype=bool) if track_nulls else null_keys(df, columns)
+        mask[~nulls] &= ~self.contains(hashes[~nulls], include_staged=include_staged)
+        self.stage(hashes[mask & ~nulls])
+        return mask
+
+
+# Índices persistentes por columna clave, bajo el directorio configurado
+index_dir = None
+_open_indexes = {}
+
+
+def set_index_dir(path):
+    global index_dir
+    index_dir = path
+    _open_indexes.clear()
+
+
+def get_index_dir():
+    return index_dir
+
+
+def get_persistent_index(column):
+    """Returns the persistent index for a key column, or None if no index dir is set"""
+    if index_dir is None:
+        return None
+    if column not in _open_indexes:
+        safe_name = ''.join(c if c.isalnum() else '_' for c in str(column))
+        _open_indexes[column] = DedupIndex(os.path.join(index_dir, safe_name))
+    return _open_indexes[column]
+
+
+def commit_persistent_indexes():
+    """Commits the staged keys of every open persistent index (call after a successful export)"""
+    for index in _open_indexes.values():
+        index.commit()
+
+
+def discard_persistent_indexes():
+    for index in _open_indexes.values():
+        index.discard()
@@ -1,19 +1,22 @@
 import json
 import pandas as pd
 import numpy as np
+from modules.stats_catalog import get_catalog
+from modules.memory_governor import optimize_memory
+from modules.date_parser import infer_formats, coerce_datetimes
 
 pd.options.future.infer_string = True
 
+# Valores más frecuentes que no son números ni fechas, listados por columna de texto
+MAX_UNPARSED_VALUES = 5
+
 
 def outlier_detection(df):
+    catalog = get_catalog(df)
     numeric_df = df.select_dtypes(include=np.number)
     outlier_report = {}
     for col in numeric_df.columns:
-        Q1 = numeric_df[col].quantile(0.25)
-        Q3 = numeric_df[col].quantile(0.75)
-        IQR = Q3 - Q1
-        lower_bound = Q1 - 1.5 * IQR
-        upper_bound = Q3 + 1.5 * IQR
+        lower_bound, upper_bound = catalog.iqr_bounds(col)
 
         outliers = numeric_df[(numeric_df[col] < lower_bound) | (numeric_df[col] > upper_bound)]
         outlier_report[col] = int(len(outliers))
@@ -49,17 +52,86 @@ def format_issues(df):
     return columns_with_upper, columns_lower
 
 
+def column_profiles(df):
+    """
+    Per-column facts used by the rule engine
+
+    Text columns are profiled on their unique values (weighted by count):
+    share of values that parse as numbers (and whole numbers) or dates, most frequent values
+    that parse as neither, padded values and case-only variants.
+    """
+    catalog = get_catalog(df)
+    profiles = {}
+
+    for col in df.columns:
+        series = df[col]
+        counts = catalog.value_counts(col)
+        non_null = int(counts.sum())
+        profile = {
+            'dtype': str(series.dtype),
+            'non_null': non_null,
+            'nulls': int(catalog.null_count(col)),
+            'unique': int(len(counts)),
+        }
+
+        if pd.api.types.is_bool_dtype(series):
+            profile['kind'] = 'boolean'
+        elif pd.api.types.is_numeric_dtype(series):
+            profile['kind'] = 'numeric'
+        elif pd.api.types.is_datetime64_any_dtype(series):
+            profile['kind'] = 'datetime'
+        else:
+            profile['kind'] = 'text'
+            values = pd.Series(counts.index.astype(str), dtype=object)
+            weights = pd.Series(counts.to_numpy(), dtype='int64')
+            stripped = values.str.strip()
+
+            numbers = pd.to_numeric(stripped, errors='coerce')
+            is_number = numbers.notna()
+            is_date = pd.Series(False, index=values.index)
+            # Solo buscamos fechas si la columna no es mayormente numérica
+            if weights[is_number].sum() < non_null / 2:
+                for fmt in infer_formats(stripped[~is_number].to_numpy()):
+                    is_date |= coerce_datetimes(pd.Index(stripped), fmt)[0].notna()
+                is_date &= ~is_number
+
+            unparsed = weights[~is_number & ~is_date].sort_values(ascending=False)
+            profile['numeric_share'] = round(weights[is_number].sum() / non_null, 4) if non_null else 0.0
+            profile['integer_share'] = (round(weights[numbers == numbers.round()].sum() / non_null, 4)
+                                        if non_null else 0.0)
+            profile['date_share'] = round(weights[is_date].sum() / non_null, 4) if non_null else 0.0
+            profile['unparsed_values'] = {values[i]: int(unparsed[i]) for i in unparsed.index[:MAX_UNPARSED_VALUES]}
+            profile['padded_share'] = round(weights[stripped != values].sum() / non_null, 4) if non_null else 0.0
+            profile['case_variants'] = int(stripped.nunique() - stripped.str.lower().nunique())
+
+        profiles[col] = profile
+    return profiles
+
+
+def load_dataset(csv_path):
+    """Reads a CSV for detection and cleaning, with the numeric types already reduced"""
+    # Reducimos los tipos numéricos antes de calcular nada
+    return optimize_memory(pd.read_csv(csv_path))
+
+
 def detect(csv_path: str):
     try:
-        csv_analyze = pd.read_csv(csv_path)
+        csv_analyze = load_dataset(csv_path)
     except Exception as e:
         return json.dumps({"error": f"No se pudo leer el archivo: {str(e)}"})
 
-    # Detección de Nulos y Duplicados (Forma eficiente)
-    columns_with_na = csv_analyze.columns[csv_analyze.isna().any()].tolist()
+    return detect_dataframe(csv_analyze), csv_analyze
+
+
+def detect_dataframe(csv_analyze):
+    """Builds the detection report (JSON string) of an already loaded DataFrame"""
+    catalog = get_catalog(csv_analyze)
+
+    # Detección de Nulos y Duplicados (desde el catálogo de estadísticas)
+    columns_with_na = [col for col in csv_analyze.columns if catalog.null_count(col) > 0]
 
     # Columnas que tienen valores duplicados
-    columns_with_duplicates = [col for col in csv_analyze.columns if csv_analyze[col].duplicated().any()]
+    columns_with_duplicates = [col for col in csv_analyze.columns if catalog.has_duplicates(col)]
 
     outlier_report = outlier_detection(csv_analyze)
     spe_char_report = spe_char_issue(csv_analyze)
@@ -72,10 +144,11 @@ def detect(csv_path: str):
         'special_char_report': spe_char_report,
         'columns_with_upper': columns_with_upper,
         'columns_lower': columns_lower,
-        'dataframe_general_info' : csv_analyze.describe().to_string(),
+        'dataframe_general_info' : catalog.describe().to_string(),
         'dataframe_shape' : str(csv_analyze.shape),
+        'column_profiles': column_profiles(csv_analyze),
     }
 
-    return json.dumps(final_detection_report, indent=4, default=str) , csv_analyze
+    return json.dumps(final_detection_report, indent=4, default=str)
 
 #Aqui deberia lanzar el json y el dataframe para entonces el cliente pasar json y un dataframe al cleaner y entonces el cleaner mapea el dataframe y activa las funciones del toolset
\ No newline at end of file
@@ -0,0 +1,124 @@
+import os
+import numpy as np
+import pandas as pd
+from modules.stats_catalog import invalidate
+
+# Presupuesto de memoria en MB, configurable con KODY_MEMORY_BUDGET_MB o --memory-budget
+DEFAULT_MEMORY_BUDGET_MB = int(os.getenv("KODY_MEMORY_BUDGET_MB", "1024"))
+# El cleaner trabaja con copias del DataFrame: reservamos margen sobre su tamaño
+WORKING_SET_FACTOR = 3
+# En modo por chunks, cada chunk usa como mucho esta fracción del presupuesto
+CHUNK_BUDGET_FRACTION = 8
+ESTIMATE_SAMPLE_ROWS = 10_000
+
+memory_budget_mb = DEFAULT_MEMORY_BUDGET_MB
+
+# Último reporte de memoria por columna, para mostrarlo desde el REPL
+last_memory_report = None
+
+
+def set_memory_budget(megabytes):
+    global memory_budget_mb
+    memory_budget_mb = megabytes
+
+
+def get_memory_budget():
+    return memory_budget_mb * 1024 * 1024
+
+
+def _downcast_float(series):
+    as_float32 = series.astype('float32')
+    if (as_float32.astype('float64') == series)[series.notna()].all():
+        return as_float32
+    return series
+
+
+def downcast(df):
+    """
+    Downcasts numeric columns in place when it is lossless
+
+    Integers (also nullable Int64) go to the smallest integer type that holds their range; floats go
+    to float32 only if every value round-trips exactly. Text columns are left
+    as they are (categoricals would break the fill strategies).
+
+    Returns:
+        (df, report) where report maps column to (bytes before, bytes after, old dtype, new dtype)
+    """
+    before = df.memory_usage(deep=True, index=False)
+    dtypes_before = df.dtypes.astype(str)
+
+    for col in df.columns:
+        dtype = df[col].dtype
+        if dtype == np.int64 or dtype == pd.Int64Dtype():
+            df[col] = pd.to_numeric(df[col], downcast='integer')
+        elif dtype == np.uint64:
+            df[col] = pd.to_numeric(df[col], downcast='unsigned')
+        elif dtype == np.float64:
+            df[col] = _downcast_float(df[col])
+
+    changed = [col for col in df.columns if str(df[col].dtype) != dtypes_before[col]]
+    if changed:
+        invalidate(df, *changed)
+
+    after = df.memory_usage(deep=True, index=False)
+    report = {
+        col: (int(before[col]), int(after[col]), dtypes_before[col], str(df[col].dtype))
+        for col in df.columns
+    }
+    return df, report
+
+
+def optimize_memory(df):
+    """Downcasts df and keeps the report in last_memory_report"""
+    global last_memory_report
+    df, last_memory_report = downcast(df)
+    return df
+
+
+def format_memory_report(report):
+    """Lines describing per-column memory before and after downcasting"""
+    total_before = sum(values[0] for values in report.values())
+    total_after = sum(values[1] for values in report.values())
+    lines = [f"Memory: {total_before / 1024 ** 2:.2f} MB → {total_after / 1024 ** 2:.2f} MB"]
+    for col, (bytes_before, bytes_after, dtype_before, dtype_after) in report.items():
+        change = f"{dtype_before} → {dtype_after}" if dtype_before != dtype_after else dtype_after
+        lines.append(f"{col}: {bytes_before / 1024:.1f} KB → {bytes_after / 1024:.1f} KB ({change})")
+    return lines
+
+
+def project_memory(csv_path, sample_rows=ESTIMATE_SAMPLE_ROWS):
+    """
+    Projects the in-memory size of a CSV from its first rows
+
+    Returns:
+        (projected bytes including the working-set margin, bytes per row)
+    """
+    sample = pd.read_csv(csv_path, nrows=sample_rows)
+    if sample.empty:
+        return 0, 0
+    downcast(sample)
+    bytes_per_row = sample.memory_usage(deep=True, index=False).sum() / len(sample)
+
+    with open(csv_path, 'rb') as f:
+        header_bytes = len(f.readline())
+        sample_file_bytes = sum(len(f.readline()) for _ in range(len(sample)))
+    data_bytes = os.path.getsize(csv_path) - header_bytes
+    estimated_rows = data_bytes / (sample_file_bytes / len(sample)) if sample_file_bytes else len(sample)
+
+    return int(estimated_rows * bytes_per_row * WORKING_SET_FACTOR), bytes_per_row
+
+
+def plan_run(csv_path):
+    """
+    Decides whether a file fits the memory budget
+
+    Returns:
+        Dict with projected_bytes, budget_bytes, chunked (bool) and chunksize (rows, or None)
+    """
+    budget = get_memory_budget()
+    projected, bytes_per_row = project_memory(csv_path)
+    chunked = projected > budget
+    chunksize = None
+    if chunked:
+        chunksize = max(1_000, int(budget / CHUNK_BUDGET_FRACTION / max(bytes_per_row, 1)))
+    return {'projected_bytes': projected, 'budget_bytes': budget, 'chunked': chunked, 'chunksize': chunksize}
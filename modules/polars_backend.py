@@ -0,0 +1,240 @@
+import numpy as np
+import pandas as pd
+from unidecode import unidecode
+from tqdm import tqdm
+from modules.date_parser import parse_dates
+
+try:
+    import polars as pl
+    POLARS_AVAILABLE = True
+except ImportError:
+    POLARS_AVAILABLE = False
+
+ROW_POSITION_COLUMN = '__kody_row__'
+
+# Estrategias que en pandas dejan la columna con un tipo nullable (Int64, string)
+NULLABLE_RESULT_STRATEGIES = {"convert_to_numeric_int", "convert_to_string"}
+# Estrategias que en pandas reemplazan la columna por un tipo no nullable
+PLAIN_RESULT_STRATEGIES = {
+    "convert_to_numeric_float", "convert_to_date", "convert_to_lowercase", "convert_to_uppercase",
+    "title_case", "remove_spaces", "normalize_characters",
+}
+
+
+def _iqr_bounds(column):
+    Q1 = pl.col(column).quantile(0.25, interpolation='linear')
+    Q3 = pl.col(column).quantile(0.75, interpolation='linear')
+    IQR = Q3 - Q1
+    return Q1 - 1.5 * IQR, Q3 + 1.5 * IQR
+
+
+def _fill_with_statistic(lf, column, value):
+    dtype = lf.collect_schema()[column]
+    if not dtype.is_integer():
+        return lf.with_columns(pl.col(column).fill_null(value))
+    # pandas no rellena un entero con un valor no entero (fillna falla y el paso se omite)
+    return lf.with_columns(
+        pl.when(value == value.round())
+        .then(pl.col(column).fill_null(value.cast(dtype)))
+        .otherwise(pl.col(column))
+    )
+
+
+def fill_with_median(lf, column):
+    return _fill_with_statistic(lf, column, pl.col(column).median())
+
+def fill_with_mean(lf, column):
+    return _fill_with_statistic(lf, column, pl.col(column).mean())
+
+def fill_with_zero(lf, column):
+    return lf.with_columns(pl.col(column).fill_null(0))
+
+def fill_with_mode(lf, column):
+    # pandas devuelve las modas ordenadas y toma la primera
+    return lf.with_columns(pl.col(column).fill_null(pl.col(column).drop_nulls().mode().sort().first()))
+
+def remove_null_rows(lf, column):
+    return lf.filter(pl.col(column).is_not_null())
+
+def remove_duplicates(lf, column):
+    return lf.unique(subset=[column], keep='first', maintain_order=True)
+
+def flag_duplicates(lf, column):
+    return lf.with_columns(pl.col(column).is_duplicated().alias('es_duplicado'))
+
+def convert_to_lowercase(lf, column):
+    return lf.with_columns(pl.col(column).cast(pl.String).str.to_lowercase())
+
+def convert_to_uppercase(lf, column):
+    return lf.with_columns(pl.col(column).cast(pl.String).str.to_uppercase())
+
+def title_case(lf, column):
+    return lf.with_columns(pl.col(column).cast(pl.String).str.to_titlecase())
+
+def remove_spaces(lf, column):
+    return lf.with_columns(pl.col(column).cast(pl.String).str.strip_chars())
+
+def normalize_characters(lf, column):
+    return lf.with_columns(
+        pl.col(column).map_elements(lambda x: unidecode(str(x)), return_dtype=pl.String)
+    )
+
+def _is_numeric(lf, column):
+    dtype = lf.collect_schema()[column]
+    return dtype.is_numeric() or dtype == pl.Boolean
+
+def convert_to_numeric_float(lf, column):
+    # pd.to_numeric deja igual una columna que ya es numérica (los enteros siguen enteros)
+    if _is_numeric(lf, column):
+        return lf
+    return lf.with_columns(pl.col(column).cast(pl.Float64, strict=False))
+
+def convert_to_numeric_int(lf, column):
+    return lf.with_columns(pl.col(column).cast(pl.Float64, strict=False).round().cast(pl.Int64))
+
+def convert_to_date(lf, column):
+    dtype = lf.collect_schema()[column]
+    if isinstance(dtype, pl.Datetime):
+        # parse_dates devuelve tal cual una columna que ya es datetime
+        return lf
+    if dtype.is_temporal():
+        return lf.with_columns(pl.col(column).cast(pl.Datetime('ns'), strict=False))
+    # Los valores únicos se parsean con date_parser, en orden de aparición como en pandas,
+    # así los dos backends infieren los mismos formatos y usan el mismo camino lento.
+    # El tipo del resultado (con o sin zona UTC) depende de los datos, así que el plan se
+    # materializa aquí una sola vez: es una barrera y los pasos anteriores no se repiten
+    frame = lf.collect(engine='streaming')
+    uniques = frame[column].drop_nulls().unique(maintain_order=True)
+    parsed, _ = parse_dates(pd.Series(uniques.to_list(), dtype=object))
+    parsed = pl.from_pandas(parsed)
+    return frame.lazy().with_columns(
+        pl.col(column).replace_strict(uniques, parsed, default=None, return_dtype=parsed.dtype)
+    )
+
+def convert_to_string(lf, column):
+    return lf.with_columns(pl.col(column).cast(pl.String))
+
+def remove_outliers(lf, column):
+    lower_bound, upper_bound = _iqr_bounds(column)
+    return lf.filter((pl.col(column) >= lower_bound) & (pl.col(column) <= upper_bound))
+
+def winsorize(lf, column):
+    lower_limit = pl.col(column).quantile(0.05, interpolation='linear')
+    upper_limit = pl.col(column).quantile(0.95, interpolation='linear')
+    # Los límites son float: en una columna entera clip los truncaría, pandas pasa a float
+    return lf.with_columns(
+        pl.col(column).cast(pl.Float64).clip(lower_limit, upper_limit).alias(f'winsorized_{column}')
+    )
+
+def get_outliers(lf, column):
+    lower_bound, upper_bound = _iqr_bounds(column)
+    return lf.filter((pl.col(column) < lower_bound) | (pl.col(column) > upper_bound))
+
+
+polars_strategies_dict = {
+    "fill_with_median": fill_with_median,
+    "fill_with_mean": fill_with_mean,
+    "fill_with_zero": fill_with_zero,
+    "fill_with_mode": fill_with_mode,
+    "remove_null_rows": remove_null_rows,
+    "remove_duplicates": remove_duplicates,
+    "flag_duplicates": flag_duplicates,
+    "convert_to_lowercase": convert_to_lowercase,
+    "convert_to_uppercase": convert_to_uppercase,
+    "title_case": title_case,
+    "remove_spaces": remove_spaces,
+    "normalize_characters": normalize_characters,
+    "convert_to_numeric_float": convert_to_numeric_float,
+    "convert_to_numeric_int": convert_to_numeric_int,
+    "convert_to_date": convert_to_date,
+    "convert_to_string": convert_to_string,
+    "remove_outliers": remove_outliers,
+    "winsorize": winsorize,
+    "get_outliers": get_outliers
+}
+
+
+def _check_step(lf, strategy_name, column):
+    """Runs a step on an empty frame with the current schema, so type errors show up while planning"""
+    probe = pl.LazyFrame(schema=lf.collect_schema())
+    polars_strategies_dict[strategy_name](probe, column).collect()
+
+
+def _is_nullable_dtype(dtype):
+    if isinstance(dtype, pd.StringDtype):
+        return dtype.na_value is pd.NA
+    return pd.api.types.is_extension_array_dtype(dtype) and pd.api.types.is_integer_dtype(dtype)
+
+
+def _to_pandas(frame, nullable_columns):
+    """
+    Converts to pandas, using nullable dtypes where the pandas toolset would
+
+    Polars has a single type for integers and for strings; pandas has numpy
+    and nullable variants (int64/Int64, str/string). Columns in
+    nullable_columns, and any integer column with nulls, become nullable.
+    """
+    result = frame.to_pandas()
+    for column, dtype in frame.schema.items():
+        if dtype.is_integer() and (column in nullable_columns or frame[column].null_count()):
+            result[column] = result[column].astype(str(dtype))
+        elif dtype == pl.String and column in nullable_columns:
+            result[column] = result[column].astype('string')
+    return result
+
+
+def apply_polars(operations, df):
+    """
+    Applies cleaning operations as a single lazy Polars query
+
+    The whole strategy list is built into one LazyFrame so Polars can
+    optimize across steps, then collected with the streaming engine. The
+    exception is convert_to_date on text, which materializes the plan built
+    so far once (its result type depends on the parsed values). Each
+    step is first checked on an empty frame with the current schema; steps
+    that fail there are skipped, as the pandas backend skips failed steps.
+
+    Args:
+        operations: List of (strategy_name, column) tuples
+        df: Pandas DataFrame
+
+    Returns:
+        Clean pandas DataFrame
+    """
+    if not POLARS_AVAILABLE:
+        raise ImportError("polars is not installed. Install with: pip install polars")
+
+    # Guardamos la posición de cada fila para restaurar el índice de pandas al final
+    lf = pl.from_pandas(df, include_index=False).lazy().with_row_index(ROW_POSITION_COLUMN)
+    nullable_columns = {column for column, dtype in df.dtypes.items() if _is_nullable_dtype(dtype)}
+
+    for strategy_name, column in tqdm(operations, desc="🧹 Planning query", unit="column"):
+        if strategy_name not in polars_strategies_dict:
+            tqdm.write(f"⚠️ Strategy '{strategy_name}' not found. Skipping...")
+            continue
+
+        if column not in lf.collect_schema().names():
+            tqdm.write(f"⚠️ Column '{column}' not found. Skipping...")
+            continue
+
+        try:
+            _check_step(lf, strategy_name, column)
+            # Una columna numérica no cambia de tipo con convert_to_numeric_float (ni deja de ser nullable)
+            keeps_dtype = strategy_name == "convert_to_numeric_float" and _is_numeric(lf, column)
+            lf = polars_strategies_dict[strategy_name](lf, column)
+            if strategy_name in NULLABLE_RESULT_STRATEGIES:
+                nullable_columns.add(column)
+            elif strategy_name in PLAIN_RESULT_STRATEGIES and not keeps_dtype:
+                nullable_columns.discard(column)
+            tqdm.write(f"✓ Planned {strategy_name} on: {column}")
+        except Exception as e:
+            tqdm.write(f"❌ Error planning {strategy_name} on {column}: {e}")
+
+    result = _to_pandas(lf.collect(engine='streaming'), nullable_columns)
+    positions = result.pop(ROW_POSITION_COLUMN).to_numpy()
+    if len(positions) == len(df) and (positions == np.arange(len(df))).all():
+        # Sin filas eliminadas ni reordenadas se conserva el índice original (p. ej. RangeIndex)
+        result.index = df.index
+    else:
+        result.index = df.index[positions]
+    return result
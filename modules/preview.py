@@ -0,0 +1,181 @@
+import io
+import json
+import math
+import os
+import random
+import threading
+
+import pandas as pd
+
+from modules.detector import detect, detect_dataframe
+from modules.LeMistral_client import get_strategies
+from modules.stats_catalog import get_catalog
+
+# Por debajo de este tamaño se lee el archivo completo
+PREVIEW_MIN_BYTES = 20 * 1024 * 1024
+DEFAULT_SAMPLE_BLOCKS = 64
+DEFAULT_BLOCK_BYTES = 32 * 1024
+Z_95 = 1.96
+
+# Listas del reporte de detección que se comparan entre vista previa y análisis completo
+REPORT_LISTS = [
+    'columns_with_na',
+    'columns_with_duplicates',
+    'special_char_report',
+    'columns_with_upper',
+    'columns_lower',
+]
+
+
+def sample_csv(csv_path, blocks=DEFAULT_SAMPLE_BLOCKS, block_bytes=DEFAULT_BLOCK_BYTES, seed=None):
+    """
+    Builds a stratified sample of a CSV by reading byte-offset blocks
+
+    The file is split into `blocks` equal strata and one block of whole lines
+    is read from a random offset inside each. Multi-line quoted fields may be
+    cut at block edges; those rows are skipped.
+
+    Returns:
+        (sample DataFrame, estimated total rows)
+    """
+    rng = random.Random(seed)
+    file_size = os.path.getsize(csv_path)
+
+    if file_size <= blocks * block_bytes:
+        sample = pd.read_csv(csv_path)
+        return sample, len(sample)
+
+    with open(csv_path, 'rb') as f:
+        header = f.readline()
+        data_start = f.tell()
+        data_size = file_size - data_start
+        stratum_size = data_size / blocks
+        lines = []
+
+        for i in range(blocks):
+            stratum_start = data_start + int(i * stratum_size)
+            offset = stratum_start + rng.randrange(max(1, int(stratum_size - block_bytes)))
+            f.seek(offset)
+            if offset > data_start:
+                f.readline()  # descartar la línea parcial
+            end = offset + block_bytes
+            while f.tell() < min(end, file_size):
+                line = f.readline()
+                if not line:
+                    break
+                lines.append(line)
+
+    sample_bytes = sum(len(line) for line in lines)
+    estimated_rows = int(data_size / (sample_bytes / len(lines))) if lines else 0
+    sample = pd.read_csv(io.BytesIO(header + b''.join(lines)), on_bad_lines='skip')
+    return sample, estimated_rows
+
+
+def wilson_interval(successes, n, z=Z_95):
+    """Wilson score interval for a proportion"""
+    if n == 0:
+        return 0.0, 1.0
+    p = successes / n
+    denominator = 1 + z ** 2 / n
+    center = (p + z ** 2 / (2 * n)) / denominator
+    margin = z * math.sqrt(p * (1 - p) / n + z ** 2 / (4 * n ** 2)) / denominator
+    return max(0.0, center - margin), min(1.0, center + margin)
+
+
+def rate_metrics(df, report):
+    """Per-column null and outlier rates, each as (rate, lower bound, upper bound)"""
+    catalog = get_catalog(df)
+    n = len(df)
+    metrics = {'null_rate': {}, 'outlier_rate': {}}
+    for col in df.columns:
+        nulls = catalog.null_count(col)
+        metrics['null_rate'][col] = (nulls / n if n else 0.0,) + wilson_interval(nulls, n)
+    for col, outliers in report['outlier_report'].items():
+        metrics['outlier_rate'][col] = (outliers / n if n else 0.0,) + wilson_interval(outliers, n)
+    return metrics
+
+
+def compare_results(preview, full):
+    """Lists where the full analysis disagrees with the preview"""
+    disagreements = []
+    for key in REPORT_LISTS:
+        only_preview = set(preview['report'][key]) - set(full['report'][key])
+        only_full = set(full['report'][key]) - set(preview['report'][key])
+        if only_preview or only_full:
+            disagreements.append(f"{key}: preview only {sorted(only_preview)}, full only {sorted(only_full)}")
+
+    for metric in ('null_rate', 'outlier_rate'):
+        for col, (rate, lower, upper) in preview['metrics'][metric].items():
+            full_rate = full['metrics'][metric].get(col, (None,))[0]
+            if full_rate is not None and not lower <= full_rate <= upper:
+                disagreements.append(
+                    f"{metric} of {col}: full {full_rate:.2%} outside preview bounds [{lower:.2%}, {upper:.2%}]")
+
+    if preview['strategies'] is not None and full['strategies'] is not None:
+        preview_plan = {(s.get('column'), s.get('strategy')) for s in preview['strategies']}
+        full_plan = {(s.get('column'), s.get('strategy')) for s in full['strategies']}
+        for column, strategy in sorted(preview_plan ^ full_plan, key=str):
+            side = "preview" if (column, strategy) in preview_plan else "full"
+            disagreements.append(f"strategy {strategy} on {column}: only in {side}")
+
+    return disagreements
+
+
+class PreviewAnalysis:
+    """
+    Instant analysis on a sample, refined by a full analysis in the background
+
+    preview holds the sample result right after start(); full and
+    disagreements are filled in once the background thread finishes.
+    """
+
+    def __init__(self, csv_path, mode="concise", request_fn=get_strategies):
+        self.csv_path = csv_path
+        self.mode = mode
+        self.request_fn = request_fn
+        self.preview = None
+        self.full = None
+        self.full_df = None
+        self.disagreements = None
+        self.error = None
+        self._thread = None
+
+    def _analyze(self, df, report_json):
+        report = json.loads(report_json)
+        try:
+            strategies = self.request_fn(report_json, self.mode)
+        except Exception as e:
+            strategies = None
+            self.error = f"Strategy request failed: {e}"
+        return {'report': report, 'metrics': rate_metrics(df, report), 'strategies': strategies}
+
+    def start(self, run_full=True):
+        """Analyzes the sample; with run_full=False no exact analysis is started (file over memory budget)"""
+        sample, estimated_rows = sample_csv(self.csv_path)
+        self.preview = self._analyze(sample, detect_dataframe(sample))
+        self.preview['sample_rows'] = len(sample)
+        self.preview['estimated_rows'] = estimated_rows
+
+        if not run_full:
+            return self.preview
+
+        self._thread = threading.Thread(target=self._run_full, daemon=True)
+        self._thread.start()
+        return self.preview
+
+    def _run_full(self):
+        try:
+            report_json, df = detect(self.csv_path)
+            self.full = self._analyze(df, report_json)
+            self.full_df = df
+            self.disagreements = compare_results(self.preview, self.full)
+        except Exception as e:
+            self.error = f"Full analysis failed: {e}"
+
+    @property
+    def done(self):
+        return self._thread is not None and not self._thread.is_alive()
+
+    def wait(self):
+        if self._thread is not None:
+            self._thread.join()
@@ -0,0 +1,229 @@
+import json
+import os
+import re
+
+# Política por defecto; un archivo JSON puede sobrescribir cualquiera de estas claves
+DEFAULT_POLICY = {
+    # Estrategia por problema: nombre de estrategia, null (no hacer nada) o "escalate" (preguntar a Mistral)
+    "numerical_null_values": "fill_with_median",
+    "categorical_null_values": "fill_with_mode",
+    "date_null_values": None,
+    "sentinel_numbers": "convert_to_numeric_float",
+    "sentinel_dates": "convert_to_date",
+    "padded_text": "remove_spaces",
+    "case_variants": "escalate",
+    "duplicate_keys": "remove_duplicates",
+    "outliers": "winsorize",
+    # Valores que marcan un dato faltante dentro de una columna numérica o de fechas
+    "sentinels": ["ERROR", "UNKNOWN", "N/A", "NA", "NAN", "NULL", "NONE", "-", "?"],
+    # Parte de los valores (números o fechas más centinelas) para convertir el tipo de una columna de texto
+    "conversion_threshold": 0.95,
+    # Por encima de esta parte de números o fechas, sin llegar al umbral, la columna es ambigua
+    "ambiguous_threshold": 0.5,
+    # Con más nulos que esto no se rellena automáticamente
+    "max_null_share": 0.5,
+    # Con más outliers que esto la distribución no es de errores aislados
+    "max_outlier_share": 0.05,
+    # Columnas clave: duplicados en ellas son filas repetidas
+    "key_column_pattern": r"(?i)(^id$|[ _]id$|^id[ _])",
+    # Columnas de texto casi únicas con duplicados, sin nombre de clave
+    "ambiguous_key_uniqueness": 0.99,
+    "escalate_ambiguous": True,
+}
+
+# Claves de la política cuyo valor es una estrategia
+STRATEGY_KEYS = (
+    "numerical_null_values", "categorical_null_values", "date_null_values", "sentinel_numbers",
+    "sentinel_dates", "padded_text", "case_variants", "duplicate_keys", "outliers",
+)
+
+DEFAULT_POLICY_PATH = os.getenv(
+    "KODY_POLICY",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "kody_policy.json"))
+
+policy_path = DEFAULT_POLICY_PATH
+_loaded_policy = None
+
+
+def set_policy_path(path):
+    global policy_path, _loaded_policy
+    policy_path = path
+    _loaded_policy = None
+
+
+def load_policy(path=None):
+    """
+    Loads the rule policy: DEFAULT_POLICY updated with the keys of a JSON file
+
+    Args:
+        path: Policy file; defaults to the configured policy path. A missing
+            default file just means the default policy.
+
+    Returns:
+        Policy dict
+    """
+    from modules.cleaner import strategies_dict
+
+    path = path or policy_path
+    policy = dict(DEFAULT_POLICY)
+    if os.path.exists(path):
+        with open(path, encoding='utf-8') as f:
+            overrides = json.load(f)
+        unknown = set(overrides) - set(DEFAULT_POLICY)
+        if unknown:
+            raise ValueError(f"Unknown policy keys in {path}: {', '.join(sorted(unknown))}")
+        policy.update(overrides)
+
+    for key in STRATEGY_KEYS:
+        if policy[key] not in (None, "escalate") and policy[key] not in strategies_dict:
+            raise ValueError(f"Unknown strategy '{policy[key]}' for '{key}' in {path}")
+    return policy
+
+
+def get_policy():
+    """Policy from the configured path, loaded once"""
+    global _loaded_policy
+    if _loaded_policy is None:
+        _loaded_policy = load_policy()
+    return _loaded_policy
+
+
+def _sentinel_values(profile, policy):
+    """Placeholder values of a text column, with their counts"""
+    sentinels = {value.upper() for value in policy['sentinels']}
+    return {value: count for value, count in profile.get('unparsed_values', {}).items()
+            if value.strip().upper() in sentinels}
+
+
+class _Plan:
+    """Strategies grouped by stage, so conversions run before fills and fills before row filters"""
+
+    STAGES = ('text', 'types', 'nulls', 'outliers', 'duplicates')
+
+    def __init__(self, policy):
+        self.policy = policy
+        self.stages = {stage: [] for stage in self.STAGES}
+        self.ambiguous = {}
+
+    def add(self, stage, policy_key, column, problem, reason):
+        strategy = self.policy[policy_key]
+        if strategy is None:
+            return
+        if strategy == "escalate":
+            self.escalate(column, reason)
+            return
+        self.stages[stage].append({
+            "column": column,
+            "problem": problem,
+            "strategy": strategy,
+            "parameters": {},
+            "reason": reason,
+        })
+
+    def escalate(self, column, reason):
+        self.ambiguous.setdefault(column, []).append(reason)
+
+    def strategies(self):
+        return [strategy for stage in self.STAGES for strategy in self.stages[stage]]
+
+
+def generate_strategies(detect_report, policy=None):
+    """
+    Builds a cleaning plan from a detection report without calling the LLM
+
+    Args:
+        detect_report: Detection report (JSON string or dict) with column_profiles
+        policy: Rule policy; defaults to get_policy()
+
+    Returns:
+        (strategies in the same format as Mistral's, dict of ambiguous column → reasons)
+    """
+    policy = policy or get_policy()
+    report = json.loads(detect_report) if isinstance(detect_report, str) else detect_report
+    plan = _Plan(policy)
+    key_pattern = re.compile(policy['key_column_pattern'])
+    duplicated = set(report.get('columns_with_duplicates', []))
+
+    for column, profile in report.get('column_profiles', {}).items():
+        non_null = profile['non_null']
+        rows = non_null + profile['nulls']
+        kind = profile['kind']
+        nulls = profile['nulls']
+
+        if kind == 'text' and non_null:
+            # Identificadores ('0042', '17'...) se dejan como texto: convertirlos pierde ceros y da floats
+            unique_share = profile['unique'] / non_null
+            looks_like_id = key_pattern.search(column) or (
+                unique_share >= policy['ambiguous_key_uniqueness']
+                and profile['numeric_share'] > 0
+                and profile.get('integer_share', 0) == profile['numeric_share'])
+            sentinels = _sentinel_values(profile, policy)
+            sentinel_share = sum(sentinels.values()) / non_null
+            if profile['padded_share'] > 0:
+                plan.add('text', 'padded_text', column, "text_inconsistencies",
+                         f"{profile['padded_share']:.1%} of values have leading or trailing spaces")
+            if profile['case_variants'] > 0:
+                plan.add('text', 'case_variants', column, "text_inconsistencies",
+                         f"{profile['case_variants']} values differ only in letter case")
+
+            conversions = () if looks_like_id else (('numeric_share', 'sentinel_numbers', 'numeric'),
+                                                    ('date_share', 'sentinel_dates', 'datetime'))
+            for share_key, policy_key, target in conversions:
+                share = profile[share_key]
+                described = 'numbers' if target == 'numeric' else 'dates'
+                if share > 0 and share + sentinel_share >= policy['conversion_threshold']:
+                    reason = f"{share:.1%} of values are {described}"
+                    if sentinels:
+                        reason += f", placeholders: {', '.join(sentinels)}"
+                    plan.add('types', policy_key, column, "incorrect_types", reason)
+                    if policy[policy_key] not in (None, "escalate"):
+                        # Al convertir, lo que no es número o fecha pasa a ser nulo
+                        kind = target
+                        nulls += non_null - round(share * non_null)
+                    break
+                if share >= policy['ambiguous_threshold']:
+                    plan.escalate(column, f"only {share:.1%} of values are {described}")
+                    break
+
+        null_key = {'numeric': 'numerical_null_values', 'text': 'categorical_null_values',
+                    'datetime': 'date_null_values'}.get(kind)
+        if nulls and null_key is not None and policy[null_key] is not None:
+            null_share = nulls / rows
+            if null_share > policy['max_null_share']:
+                plan.escalate(column, f"{null_share:.1%} of values are missing")
+            else:
+                problem = "numerical_null_values" if kind == 'numeric' else "categorical_null_values"
+                plan.add('nulls', null_key, column, problem, f"{nulls} missing values ({null_share:.1%})")
+
+        outliers = report.get('outlier_report', {}).get(column, 0)
+        if outliers:
+            outlier_share = outliers / max(non_null, 1)
+            if outlier_share > policy['max_outlier_share']:
+                plan.escalate(column, f"{outlier_share:.1%} of values are outside the IQR bounds")
+            else:
+                plan.add('outliers', 'outliers', column, "outliers",
+                         f"{outliers} values outside the IQR bounds ({outlier_share:.1%})")
+
+        if column in duplicated and profile['kind'] in ('text', 'numeric') and non_null:
+            if key_pattern.search(column):
+                plan.add('duplicates', 'duplicate_keys', column, "duplicates",
+                         f"key column with {non_null - profile['unique']} repeated values")
+            elif profile['kind'] == 'text' and profile['unique'] / non_null >= policy['ambiguous_key_uniqueness']:
+                plan.escalate(column, "almost unique values with some duplicates (possible key column)")
+
+    return plan.strategies(), plan.ambiguous
+
+
+def escalation_report(detect_report, ambiguous):
+    """Detection report restricted to the ambiguous columns, with the reasons they are ambiguous"""
+    report = json.loads(detect_report) if isinstance(detect_report, str) else detect_report
+    columns = set(ambiguous)
+    reduced = {
+        key: [col for col in value if col in columns]
+        for key, value in report.items() if isinstance(value, list)
+    }
+    reduced['outlier_report'] = {col: n for col, n in report.get('outlier_report', {}).items() if col in columns}
+    reduced['column_profiles'] = {col: p for col, p in report.get('column_profiles', {}).items() if col in columns}
+    reduced['ambiguous_columns'] = ambiguous
+    reduced['dataframe_shape'] = report.get('dataframe_shape')
+    return json.dumps(reduced, indent=4, default=str)
@@ -0,0 +1,295 @@
+import hmac
+import json
+import os
+import secrets
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from modules.detector import detect_dataframe, load_dataset
+from modules.LeMistral_client import get_strategies
+from modules.cleaner import lemistral_helper_action, build_operations, DEFAULT_BACKEND
+from modules.chunked import stream_clean
+from modules.dedup_index import commit_persistent_indexes, discard_persistent_indexes, get_index_dir
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+DEFAULT_WORKERS = 4
+
+# Cabecera con el token de la sesión; un formulario de otra web no puede enviarla sin preflight
+TOKEN_HEADER = "X-Kody-Token"
+TOKEN_FILE = ".service_token"
+
+# Límites de la caché: datasets cargados, resultados limpios por dataset y trabajos terminados
+MAX_DATASETS = 8
+MAX_CLEAN_RESULTS = 4
+MAX_FINISHED_JOBS = 100
+FINISHED_JOB_TTL = 3600
+
+
+class KodyService:
+    """
+    Keeps datasets, detection reports, strategy plans and clean results warm
+
+    Datasets are cached by (absolute path, mtime, size), so a changed file is
+    reloaded automatically; the least recently used ones are evicted past
+    MAX_DATASETS. Jobs run on a worker pool; requests for the same file are
+    serialized by a per-dataset lock so work is never duplicated. Input files
+    must be under data_dir and outputs are written under outputs_dir.
+    """
+
+    def __init__(self, outputs_dir, data_dir, workers=DEFAULT_WORKERS):
+        self.outputs_dir = os.path.realpath(outputs_dir)
+        self.data_dir = os.path.realpath(data_dir)
+        self.executor = ThreadPoolExecutor(max_workers=workers)
+        self.datasets = OrderedDict()
+        self.jobs = OrderedDict()
+        self._lock = threading.Lock()
+        # El índice de duplicados persistente es global: sus aplicaciones no pueden solaparse
+        self._index_lock = threading.Lock()
+
+    @staticmethod
+    def _inside(path, root):
+        """Resolves path (relative paths against root) and checks it stays under root"""
+        resolved = os.path.realpath(os.path.join(root, path))
+        if os.path.commonpath([resolved, root]) != root:
+            raise ValueError(f"Path outside {root}: {path}")
+        return resolved
+
+    def data_path(self, csv_path):
+        return self._inside(csv_path, self.data_dir)
+
+    def output_path(self, output_path):
+        return self._inside(output_path, self.outputs_dir)
+
+    def _dataset(self, csv_path):
+        """Returns the cache entry for a file, loading it if new or changed"""
+        csv_path = self.data_path(csv_path)
+        stat = os.stat(csv_path)
+        key = (stat.st_mtime_ns, stat.st_size)
+
+        with self._lock:
+            entry = self.datasets.get(csv_path)
+            if entry is None or entry['key'] != key:
+                entry = {'key': key, 'lock': threading.Lock(), 'df': None,
+                         'report': None, 'strategies': {}, 'clean': OrderedDict()}
+                self.datasets[csv_path] = entry
+            self.datasets.move_to_end(csv_path)
+            while len(self.datasets) > MAX_DATASETS:
+                # Los trabajos en curso conservan su referencia a la entrada
+                self.datasets.popitem(last=False)
+
+        with entry['lock']:
+            if entry['df'] is None:
+                # Mismo cargador que el REPL: los reportes y planes coinciden
+                entry['df'] = load_dataset(csv_path)
+        return entry
+
+    def detect(self, csv_path):
+        entry = self._dataset(csv_path)
+        with entry['lock']:
+            if entry['report'] is None:
+                entry['report'] = detect_dataframe(entry['df'])
+        return json.loads(entry['report'])
+
+    def analyze(self, csv_path, mode="concise"):
+        self.detect(csv_path)
+        entry = self._dataset(csv_path)
+        with entry['lock']:
+            if mode not in entry['strategies']:
+                entry['strategies'][mode] = get_strategies(entry['report'], mode)
+        return entry['strategies'][mode]
+
+    def apply(self, csv_path, output_path=None, strategies=None, mode="concise",
+              backend=DEFAULT_BACKEND, chunksize=None):
+        csv_path = self.data_path(csv_path)
+        if strategies is None:
+            strategies = self.analyze(csv_path, mode)
+
+        if output_path is None:
+            name_without_ext = os.path.splitext(os.path.basename(csv_path))[0]
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            output_path = f"{name_without_ext}_clean_{timestamp}.csv"
+        output_path = self.output_path(output_path)
+        os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+
+        entry = self._dataset(csv_path)
+        with self._index_lock if get_index_dir() else nullcontext(), entry['lock']:
+            discard_persistent_indexes()
+            if chunksize:
+                rows, columns = stream_clean(csv_path, build_operations(strategies), output_path, chunksize)
+            else:
+                plan_key = (json.dumps(strategies, sort_keys=True), backend)
+                # Con índice persistente el resultado depende del historial: no se reutiliza
+                if plan_key not in entry['clean'] or get_index_dir():
+                    # El cleaner modifica el DataFrame: trabajamos sobre una copia
+                    entry['clean'][plan_key] = lemistral_helper_action(strategies, entry['df'].copy(),
+                                                                       backend=backend)
+                entry['clean'].move_to_end(plan_key)
+                while len(entry['clean']) > MAX_CLEAN_RESULTS:
+                    entry['clean'].popitem(last=False)
+                clean = entry['clean'][plan_key]
+                clean.to_csv(output_path, index=False)
+                rows, columns = clean.shape
+            commit_persistent_indexes()
+
+        return {'output_path': output_path, 'rows': int(rows), 'columns': int(columns)}
+
+    def status(self):
+        with self._lock:
+            datasets = {
+                path: {
+                    'rows': None if entry['df'] is None else int(entry['df'].shape[0]),
+                    'detected': entry['report'] is not None,
+                    'strategy_modes': list(entry['strategies']),
+                    'clean_results': len(entry['clean']),
+                }
+                for path, entry in self.datasets.items()
+            }
+            jobs = {job_id: job['status'] for job_id, job in self.jobs.items()}
+        return {'datasets': datasets, 'jobs': jobs}
+
+    def submit(self, op, params):
+        """Queues a job and returns its id"""
+        operations = {'detect': self.detect, 'analyze': self.analyze, 'apply': self.apply}
+        if op not in operations:
+            raise ValueError(f"Unknown operation '{op}'. Available: {', '.join(operations)}")
+
+        # Rutas fuera de data/ u outputs/ se rechazan al enviar, no al ejecutar
+        params = dict(params)
+        if 'csv_path' in params:
+            params['csv_path'] = self.data_path(params['csv_path'])
+        if params.get('output_path') is not None:
+            params['output_path'] = self.output_path(params['output_path'])
+
+        job_id = uuid.uuid4().hex[:12]
+        job = {'op': op, 'status': 'queued', 'result': None, 'error': None, 'finished': None}
+        with self._lock:
+            self._prune_jobs()
+            self.jobs[job_id] = job
+
+        def run():
+            job['status'] = 'running'
+            try:
+                job['result'] = operations[op](**params)
+                job['status'] = 'done'
+            except Exception as e:
+                job['error'] = str(e)
+                job['status'] = 'failed'
+            job['finished'] = time.monotonic()
+
+        job['future'] = self.executor.submit(run)
+        return job_id
+
+    def _prune_jobs(self):
+        """Drops finished jobs older than FINISHED_JOB_TTL and the oldest past MAX_FINISHED_JOBS"""
+        now = time.monotonic()
+        finished = [job_id for job_id, job in self.jobs.items() if job['finished'] is not None]
+        for position, job_id in enumerate(finished):
+            expired = now - self.jobs[job_id]['finished'] > FINISHED_JOB_TTL
+            if expired or len(finished) - position > MAX_FINISHED_JOBS:
+                del self.jobs[job_id]
+
+    def job(self, job_id, wait=False):
+        job = self.jobs.get(job_id)
+        if job is None:
+            return None
+        if wait:
+            job['future'].result()
+        return {key: job[key] for key in ('op', 'status', 'result', 'error')}
+
+
+def make_handler(service, token):
+    class KodyRequestHandler(BaseHTTPRequestHandler):
+        def _authorized(self):
+            if hmac.compare_digest(self.headers.get(TOKEN_HEADER, ''), token):
+                return True
+            self._send(401, {'error': f'missing or invalid {TOKEN_HEADER} header'})
+            return False
+
+        def _send(self, status, body):
+            data = json.dumps(body, default=str).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_GET(self):
+            if not self._authorized():
+                return
+            if self.path == '/status':
+                return self._send(200, service.status())
+            if self.path.startswith('/jobs/'):
+                job = service.job(self.path[len('/jobs/'):])
+                if job is None:
+                    return self._send(404, {'error': 'job not found'})
+                return self._send(200, job)
+            self._send(404, {'error': 'not found'})
+
+        def do_POST(self):
+            if not self._authorized():
+                return
+            if self.path != '/jobs':
+                return self._send(404, {'error': 'not found'})
+            content_type = self.headers.get('Content-Type', '').split(';')[0].strip().lower()
+            if content_type != 'application/json':
+                return self._send(415, {'error': 'Content-Type must be application/json'})
+            try:
+                length = int(self.headers.get('Content-Length', 0))
+                body = json.loads(self.rfile.read(length) or b'{}')
+                if not isinstance(body, dict):
+                    raise ValueError("request body must be a JSON object")
+                wait = body.pop('wait', False)
+                job_id = service.submit(body.pop('op', ''), body)
+            except (ValueError, TypeError) as e:
+                return self._send(400, {'error': str(e)})
+            if wait:
+                return self._send(200, dict(service.job(job_id, wait=True), job_id=job_id))
+            self._send(202, {'job_id': job_id})
+
+        def log_message(self, format, *args):
+            pass
+
+    return KodyRequestHandler
+
+
+def write_token(outputs_dir, token=None):
+    """
+    Stores the session token where local clients can read it
+
+    Args:
+        outputs_dir: Directory of the token file (readable only by the owner)
+        token: Token to store; defaults to KODY_SERVICE_TOKEN or a random one
+
+    Returns:
+        The token
+    """
+    token = token or os.getenv("KODY_SERVICE_TOKEN") or secrets.token_urlsafe(32)
+    os.makedirs(outputs_dir, exist_ok=True)
+    token_path = os.path.join(outputs_dir, TOKEN_FILE)
+    fd = os.open(token_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, 'w') as f:
+        f.write(token)
+    return token
+
+
+def run_server(outputs_dir, data_dir, host=DEFAULT_HOST, port=DEFAULT_PORT, workers=DEFAULT_WORKERS):
+    """Serves the cleaning operations over HTTP until interrupted"""
+    service = KodyService(outputs_dir, data_dir, workers=workers)
+    token = write_token(outputs_dir)
+    server = ThreadingHTTPServer((host, port), make_handler(service, token))
+    print(f"🧹 Kody service listening on http://{host}:{port} ({workers} workers)")
+    print(f"🔑 Requests need the {TOKEN_HEADER} header; token in {os.path.join(outputs_dir, TOKEN_FILE)}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.executor.shutdown(wait=False)
@@ -0,0 +1,101 @@
+import argparse
+import json
+import os
+import sys
+import urllib.error
+import urllib.request
+
+# Cliente ligero: solo librería estándar, para arrancar rápido
+
+DEFAULT_URL = "http://127.0.0.1:8765"
+# El servicio escribe aquí su token al arrancar (mismos valores que modules/service.py)
+TOKEN_HEADER = "X-Kody-Token"
+DEFAULT_TOKEN_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                  "outputs", ".service_token")
+
+
+def read_token(token_path=DEFAULT_TOKEN_PATH):
+    """Token from KODY_SERVICE_TOKEN or the file written by the service"""
+    token = os.getenv("KODY_SERVICE_TOKEN")
+    if token:
+        return token
+    if os.path.exists(token_path):
+        with open(token_path) as f:
+            return f.read().strip()
+    return ""
+
+
+def _request(url, method="GET", body=None, token=None):
+    data = None if body is None else json.dumps(body).encode('utf-8')
+    headers = {'Content-Type': 'application/json', TOKEN_HEADER: token or read_token()}
+    request = urllib.request.Request(url, data=data, method=method, headers=headers)
+    try:
+        with urllib.request.urlopen(request) as response:
+            return json.loads(response.read())
+    except urllib.error.HTTPError as e:
+        return json.loads(e.read())
+
+
+def submit(op, base_url=DEFAULT_URL, wait=True, token=None, **params):
+    """
+    Submits a job to the Kody service; with wait=True returns the finished job
+
+    csv_path must be under the service's data/ directory and output_path under
+    outputs/; relative paths are resolved against those directories.
+    """
+    return _request(f"{base_url}/jobs", "POST", dict(params, op=op, wait=wait), token)
+
+
+def job(job_id, base_url=DEFAULT_URL, token=None):
+    return _request(f"{base_url}/jobs/{job_id}", token=token)
+
+
+def status(base_url=DEFAULT_URL, token=None):
+    return _request(f"{base_url}/status", token=token)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Client for the Kody cleaning service")
+    parser.add_argument("--url", default=DEFAULT_URL)
+    parser.add_argument("--token", default=None,
+                        help="Service token (defaults to KODY_SERVICE_TOKEN or outputs/.service_token)")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    for op in ("detect", "analyze", "apply"):
+        op_parser = subparsers.add_parser(op)
+        op_parser.add_argument("csv_path")
+        op_parser.add_argument("--no-wait", action="store_true", help="Return the job id right away")
+        if op in ("analyze", "apply"):
+            op_parser.add_argument("--mode", default="concise")
+        if op == "apply":
+            op_parser.add_argument("--output", dest="output_path", help="Output file, relative to outputs/")
+            op_parser.add_argument("--backend")
+            op_parser.add_argument("--chunksize", type=int)
+
+    job_parser = subparsers.add_parser("job")
+    job_parser.add_argument("job_id")
+    subparsers.add_parser("status")
+
+    args = vars(parser.parse_args())
+    base_url = args.pop("url")
+    token = args.pop("token")
+    command = args.pop("command")
+
+    if command == "status":
+        result = status(base_url, token)
+    elif command == "job":
+        result = job(args["job_id"], base_url, token)
+    else:
+        wait = not args.pop("no_wait")
+        params = {key: value for key, value in args.items() if value is not None}
+        # Una ruta existente se envía absoluta; si no, el servicio la resuelve en data/
+        if os.path.exists(params["csv_path"]):
+            params["csv_path"] = os.path.abspath(params["csv_path"])
+        result = submit(command, base_url, wait=wait, token=token, **params)
+
+    print(json.dumps(result, indent=4))
+    return 1 if result.get('error') else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
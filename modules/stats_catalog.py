@@ -0,0 +1,124 @@
+import weakref
+
+import numpy as np
+import pandas as pd
+
+# Cuantiles que se calculan juntos en una sola pasada por columna
+CATALOG_QUANTILES = (0.05, 0.25, 0.5, 0.75, 0.95)
+
+_catalogs = {}
+
+
+class StatsCatalog:
+    """
+    Memoized per-column statistics for a single DataFrame.
+
+    Every stage (detector, toolset, REPL) reads column stats from here instead
+    of rescanning the data. Transforms that modify a column must call
+    invalidate(column) so only that column is recomputed on the next read.
+    """
+
+    def __init__(self, df):
+        self._df_ref = weakref.ref(df)
+        self._stats = {}
+
+    @property
+    def df(self):
+        return self._df_ref()
+
+    def _get(self, column, key, compute):
+        column_stats = self._stats.setdefault(column, {})
+        if key not in column_stats:
+            column_stats[key] = compute(self.df[column])
+        return column_stats[key]
+
+    def invalidate(self, *columns):
+        """Drops cached stats for the given columns (all columns if none given)."""
+        if not columns:
+            self._stats.clear()
+            return
+        for column in columns:
+            self._stats.pop(column, None)
+
+    def is_numeric(self, column):
+        return self._get(column, 'is_numeric', lambda s: pd.api.types.is_numeric_dtype(s))
+
+    def quantiles(self, column):
+        """Returns the CATALOG_QUANTILES of a column, computed in one pass."""
+        return self._get(column, 'quantiles', lambda s: s.quantile(list(CATALOG_QUANTILES)))
+
+    def quantile(self, column, q):
+        if q in CATALOG_QUANTILES:
+            return self.quantiles(column)[q]
+        return self._get(column, ('quantile', q), lambda s: s.quantile(q))
+
+    def median(self, column):
+        return self.quantile(column, 0.5)
+
+    def mean(self, column):
+        return self._get(column, 'mean', lambda s: s.mean())
+
+    def min(self, column):
+        return self._get(column, 'min', lambda s: s.min())
+
+    def max(self, column):
+        return self._get(column, 'max', lambda s: s.max())
+
+    def iqr_bounds(self, column):
+        """Returns the (lower, upper) 1.5*IQR outlier bounds of a column."""
+        Q1 = self.quantile(column, 0.25)
+        Q3 = self.quantile(column, 0.75)
+        IQR = Q3 - Q1
+        return Q1 - 1.5 * IQR, Q3 + 1.5 * IQR
+
+    def null_count(self, column):
+        return self._get(column, 'null_count', lambda s: int(s.isna().sum()))
+
+    def null_counts(self):
+        """Null count per column, like df.isnull().sum()."""
+        df = self.df
+        return pd.Series({col: self.null_count(col) for col in df.columns}, index=df.columns, dtype='int64')
+
+    def has_duplicates(self, column):
+        return self._get(column, 'has_duplicates', lambda s: bool(s.duplicated().any()))
+
+    def value_counts(self, column):
+        return self._get(column, 'value_counts', lambda s: s.value_counts())
+
+    def mode(self, column):
+        return self._get(column, 'mode', lambda s: s.mode())
+
+    def describe_column(self, column):
+        return self._get(column, 'describe', lambda s: s.describe())
+
+    def describe(self):
+        """Same output as df.describe() (numeric and datetime columns), assembled from cached columns."""
+        df = self.df
+        described_cols = df.select_dtypes(include=[np.number, 'datetime']).columns
+        if len(described_cols) == 0:
+            return df.describe()
+        summaries = [self.describe_column(col) for col in described_cols]
+        # Mismo orden de filas que df.describe(): primero los resúmenes más cortos
+        ordered = sorted((summary.index for summary in summaries), key=len)
+        rows = list(dict.fromkeys(name for index in ordered for name in index))
+        result = pd.concat([summary.reindex(rows) for summary in summaries], axis=1, ignore_index=True, sort=False)
+        result.columns = described_cols.copy()
+        return result
+
+
+def get_catalog(df):
+    """Returns the StatsCatalog attached to df, creating it on first use."""
+    key = id(df)
+    catalog = _catalogs.get(key)
+    if catalog is None or catalog.df is not df:
+        catalog = StatsCatalog(df)
+        _catalogs[key] = catalog
+        weakref.finalize(df, _catalogs.pop, key, None)
+    return catalog
+
+
+def invalidate(df, *columns):
+    """Invalidates cached stats of the given columns of df, if it has a catalog."""
+    catalog = _catalogs.get(id(df))
+    if catalog is not None and catalog.df is df:
+        catalog.invalidate(*columns)
@@ -1,89 +1,109 @@
 import pandas as pd
 from unidecode import unidecode
+from modules.stats_catalog import get_catalog, invalidate
+from modules.date_parser import parse_dates
+from modules.dedup_index import get_persistent_index, hash_keys, null_keys
 
 def fill_with_median(df, column):
-    df[column] = df[column].fillna(df[column].median())
+    df[column] = df[column].fillna(get_catalog(df).median(column))
+    invalidate(df, column)
     return df
 
 def fill_with_mean(df, column):
-    df[column] = df[column].fillna(df[column].mean())
+    df[column] = df[column].fillna(get_catalog(df).mean(column))
+    invalidate(df, column)
     return df
 
 def fill_with_zero(df, column):
     df[column] = df[column].fillna(0)
+    invalidate(df, column)
     return df
 
 def fill_with_mode(df, column):
-    mode_val = df[column].mode()
+    mode_val = get_catalog(df).mode(column)
     if not mode_val.empty:
         df[column] = df[column].fillna(mode_val[0])
+        invalidate(df, column)
     return df
 
 def remove_null_rows(df, column):
     return df.dropna(subset=[column])
 
 def remove_duplicates(df, column):
-    return df.drop_duplicates(subset=[column], keep='first')
+    index = get_persistent_index(column)
+    if index is None:
+        return df.drop_duplicates(subset=[column], keep='first')
+    # También descarta claves ya vistas en archivos anteriores
+    return df[index.first_seen(df, [column], include_staged=False)]
 
 def flag_duplicates(df, column):
     df['es_duplicado'] = df.duplicated(subset=[column], keep=False)
+    index = get_persistent_index(column)
+    if index is not None:
+        keyed = ~null_keys(df, [column])
+        hashes = hash_keys(df[keyed], [column])
+        df.loc[keyed, 'es_duplicado'] |= index.contains(hashes, include_staged=False)
+        index.stage(hashes)
+    invalidate(df, 'es_duplicado')
     return df
 
 def convert_to_lowercase(df, column):
     df[column] = df[column].astype(str).str.lower()
+    invalidate(df, column)
     return df
 
 def convert_to_uppercase(df, column):
     df[column] = df[column].astype(str).str.upper()
+    invalidate(df, column)
     return df
 
 def title_case(df, column):
     df[column] = df[column].astype(str).str.title()
+    invalidate(df, column)
     return df
 
 def remove_spaces(df, column):
     df[column] = df[column].astype(str).str.strip()
+    invalidate(df, column)
     return df
 
 def normalize_characters(df, column):
     df[column] = df[column].apply(lambda x: unidecode(str(x)) if pd.notnull(x) else x)
+    invalidate(df, column)
     return df
 
 def convert_to_numeric_float(df, column):
     df[column] = pd.to_numeric(df[column], errors='coerce')
+    invalidate(df, column)
     return df
 
 def convert_to_numeric_int(df, column):
     df[column] = pd.to_numeric(df[column], errors='coerce').round().astype('Int64')
+    invalidate(df, column)
     return df
 
 def convert_to_date(df, column):
-    df[column] = pd.to_datetime(df[column], errors='coerce')
+    df[column], _ = parse_dates(df[column], column=column)
+    invalidate(df, column)
     return df
 
 def convert_to_string(df, column):
     df[column] = df[column].astype('string')
+    invalidate(df, column)
     return df
 
 def remove_outliers(df, column):
-    Q1 = df[column].quantile(0.25)
-    Q3 = df[column].quantile(0.75)
-    IQR = Q3 - Q1
-    lower_bound = Q1 - 1.5 * IQR
-    upper_bound = Q3 + 1.5 * IQR
+    lower_bound, upper_bound = get_catalog(df).iqr_bounds(column)
     return df[(df[column] >= lower_bound) & (df[column] <= upper_bound)].copy()
 
 def winsorize(df, column):
-    lower_limit = df[column].quantile(0.05)
-    upper_limit = df[column].quantile(0.95)
+    catalog = get_catalog(df)
+    lower_limit = catalog.quantile(column, 0.05)
+    upper_limit = catalog.quantile(column, 0.95)
     df[f'winsorized_{column}'] = df[column].clip(lower=lower_limit, upper=upper_limit)
+    invalidate(df, f'winsorized_{column}')
     return df
 
 def get_outliers(df, column):
-    Q1 = df[column].quantile(0.25)
-    Q3 = df[column].quantile(0.75)
-    IQR = Q3 - Q1
-    lower_bound = Q1 - 1.5 * IQR
-    upper_bound = Q3 + 1.5 * IQR
+    lower_bound, upper_bound = get_catalog(df).iqr_bounds(column)
     return df[(df[column] < lower_bound) | (df[column] > upper_bound)].copy()
-
@@ -0,0 +1,336 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+# watchdog usa inotify en Linux; sin él se revisa el directorio periódicamente
+try:
+    from watchdog.observers import Observer
+    from watchdog.events import FileSystemEventHandler
+    WATCHDOG_AVAILABLE = True
+except ImportError:
+    WATCHDOG_AVAILABLE = False
+    FileSystemEventHandler = object
+
+DEFAULT_SETTLE_SECONDS = 2.0
+DEFAULT_POLL_INTERVAL = 2.0
+HASH_BLOCK_BYTES = 1024 * 1024
+
+
+def file_hash(path):
+    """Content hash of a file, read in blocks"""
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(HASH_BLOCK_BYTES), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def is_csv(path):
+    name = os.path.basename(path)
+    return name.lower().endswith('.csv') and not name.startswith('.')
+
+
+class FileIndex:
+    """
+    Persistent index of the CSV files under a directory
+
+    Keeps size, mtime and content hash per file, plus the hash that was last
+    pushed through the pipeline. Directory listings are cached by directory
+    mtime, so a scan only re-lists directories where files were added or
+    removed.
+    """
+
+    def __init__(self, index_path):
+        self.index_path = index_path
+        self.files = {}
+        self.dirs = {}
+        self._lock = threading.Lock()
+        if os.path.exists(index_path):
+            try:
+                with open(index_path, encoding='utf-8') as f:
+                    data = json.load(f)
+                self.files = data.get('files', {})
+                self.dirs = data.get('dirs', {})
+            except (OSError, ValueError):
+                pass
+
+    def save(self):
+        with self._lock:
+            data = json.dumps({'files': self.files, 'dirs': self.dirs}, indent=2)
+        os.makedirs(os.path.dirname(self.index_path) or '.', exist_ok=True)
+        tmp_path = self.index_path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(data)
+        os.replace(tmp_path, self.index_path)
+
+    def _list_dir(self, directory, changed):
+        try:
+            mtime_ns = os.stat(directory).st_mtime_ns
+        except FileNotFoundError:
+            self.dirs.pop(directory, None)
+            return [], []
+
+        cached = self.dirs.get(directory)
+        if cached is not None and cached['mtime_ns'] == mtime_ns:
+            return cached['subdirs'], cached['csvs']
+
+        subdirs, csvs = [], []
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if entry.is_dir() and not entry.name.startswith('.'):
+                    subdirs.append(entry.path)
+                elif entry.is_file() and is_csv(entry.path):
+                    csvs.append(entry.path)
+                    if self._update_from_stat(entry.path, entry.stat()):
+                        changed.add(entry.path)
+        for path in set(cached['csvs'] if cached else []) - set(csvs):
+            self.files.pop(path, None)
+            changed.add(path)
+        self.dirs[directory] = {'mtime_ns': mtime_ns, 'subdirs': subdirs, 'csvs': csvs}
+        return subdirs, csvs
+
+    def scan(self, root, changed=None):
+        """
+        Sorted CSV paths under root, re-listing only changed directories
+
+        Args:
+            root: Directory to scan
+            changed: Optional set that receives the paths found new, changed
+                or removed while re-listing
+        """
+        changed = set() if changed is None else changed
+        csv_files = []
+        with self._lock:
+            pending = [root]
+            while pending:
+                subdirs, csvs = self._list_dir(pending.pop(), changed)
+                pending.extend(subdirs)
+                csv_files.extend(csvs)
+        return sorted(csv_files)
+
+    def _update_from_stat(self, path, stat):
+        entry = self.files.get(path)
+        if entry is not None and entry['size'] == stat.st_size and entry['mtime_ns'] == stat.st_mtime_ns:
+            return False
+        self.files[path] = {
+            'size': stat.st_size,
+            'mtime_ns': stat.st_mtime_ns,
+            'hash': None,
+            'processed_hash': entry['processed_hash'] if entry else None,
+        }
+        return True
+
+    def update(self, path):
+        """Refreshes one file from disk; returns True if its size or mtime changed"""
+        with self._lock:
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                return self.files.pop(path, None) is not None
+            return self._update_from_stat(path, stat)
+
+    def size(self, path):
+        """Current size of a file; the listing cache does not see in-place edits, so it is stat'ed"""
+        self.update(path)
+        entry = self.files.get(path)
+        return entry['size'] if entry else os.path.getsize(path)
+
+    def content_hash(self, path):
+        with self._lock:
+            entry = self.files.get(path)
+            if entry is not None and entry['hash'] is not None:
+                return entry['hash']
+        digest = file_hash(path)
+        with self._lock:
+            if path in self.files:
+                self.files[path]['hash'] = digest
+        return digest
+
+    def needs_processing(self, path):
+        entry = self.files.get(path)
+        return entry is not None and self.content_hash(path) != entry['processed_hash']
+
+    def mark_processed(self, path, digest):
+        with self._lock:
+            if path in self.files:
+                self.files[path]['processed_hash'] = digest
+
+
+def process_file(csv_path, outputs_dir, backend=None, mode="concise"):
+    """
+    Runs the whole cleaning pipeline on a file and exports the result
+
+    Uses chunked processing when the file is over the memory budget.
+
+    Returns:
+        Path of the clean CSV
+    """
+    from modules.cleaner import lemistral_helper_action, build_operations
+    from modules.chunked import stream_clean
+    from modules.detector import detect, detect_dataframe
+    from modules.dedup_index import commit_persistent_indexes, discard_persistent_indexes
+    from modules.LeMistral_client import get_strategies
+    from modules.memory_governor import plan_run
+    from modules.preview import sample_csv
+
+    name_without_ext = os.path.splitext(os.path.basename(csv_path))[0]
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    output_path = os.path.join(outputs_dir, f"{name_without_ext}_clean_{timestamp}.csv")
+    os.makedirs(outputs_dir, exist_ok=True)
+
+    discard_persistent_indexes()
+    plan = plan_run(csv_path)
+    if plan['chunked']:
+        sample, _ = sample_csv(csv_path)
+        strategies = get_strategies(detect_dataframe(sample), mode)
+        stream_clean(csv_path, build_operations(strategies), output_path, plan['chunksize'])
+    else:
+        report_json, df = detect(csv_path)
+        strategies = get_strategies(report_json, mode)
+        lemistral_helper_action(strategies, df, backend=backend).to_csv(output_path, index=False)
+        commit_persistent_indexes()
+    return output_path
+
+
+class _EventHandler(FileSystemEventHandler):
+    def __init__(self, watcher):
+        self.watcher = watcher
+
+    def on_created(self, event):
+        if not event.is_directory:
+            self.watcher.notify(event.src_path)
+
+    def on_modified(self, event):
+        if not event.is_directory:
+            self.watcher.notify(event.src_path)
+
+    def on_moved(self, event):
+        if not event.is_directory:
+            self.watcher.notify(event.src_path)
+            self.watcher.notify(event.dest_path)
+
+    def on_deleted(self, event):
+        if not event.is_directory:
+            self.watcher.notify(event.src_path)
+
+
+class DataWatcher:
+    """
+    Watches a data directory and pushes new or changed CSVs through the pipeline
+
+    File events (inotify via watchdog, or periodic polling as a fallback) only
+    mark a path as pending. A pending file is processed once its size and
+    mtime have stayed the same for settle_seconds, so partially written files
+    are skipped, and only if its content hash differs from the last processed one.
+    """
+
+    def __init__(self, data_dir, outputs_dir, index, settle_seconds=DEFAULT_SETTLE_SECONDS,
+                 poll_interval=DEFAULT_POLL_INTERVAL, workers=1, process_fn=process_file, log=print):
+        self.data_dir = os.path.abspath(data_dir)
+        self.outputs_dir = outputs_dir
+        self.index = index
+        self.settle_seconds = settle_seconds
+        self.poll_interval = poll_interval
+        self.process_fn = process_fn
+        self.log = log
+        self.executor = ThreadPoolExecutor(max_workers=workers)
+        self.pending = {}
+        self.in_progress = set()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+
+    def notify(self, path):
+        path = os.path.abspath(path)
+        if not is_csv(path):
+            return
+        self.index.update(path)
+        with self._lock:
+            self.pending[path] = time.monotonic()
+
+    def _poll(self):
+        """Polling fallback: stats every indexed file (O(files), unlike inotify)"""
+        # Los archivos nuevos se registran al volver a listar su directorio
+        changed = set()
+        for path in self.index.scan(self.data_dir, changed):
+            if self.index.update(path):
+                changed.add(path)
+        for path in list(self.index.files):
+            if not os.path.exists(path):
+                changed.add(path)
+        for path in changed:
+            self.notify(path)
+
+    def _settle(self):
+        now = time.monotonic()
+        with self._lock:
+            ready = [path for path, seen in self.pending.items()
+                     if now - seen >= self.settle_seconds and path not in self.in_progress]
+
+        for path in ready:
+            # Si cambió desde el último evento, todavía se está escribiendo
+            if self.index.update(path):
+                with self._lock:
+                    self.pending[path] = time.monotonic()
+                continue
+            with self._lock:
+                self.pending.pop(path, None)
+            if not os.path.exists(path) or not self.index.needs_processing(path):
+                continue
+            with self._lock:
+                self.in_progress.add(path)
+            self.executor.submit(self._process, path, self.index.content_hash(path))
+
+    def _process(self, path, digest):
+        relative_path = os.path.relpath(path, self.data_dir)
+        self.log(f"🧹 Processing {relative_path}...")
+        try:
+            output_path = self.process_fn(path, self.outputs_dir)
+            self.index.mark_processed(path, digest)
+            self.index.save()
+            self.log(f"✓ {relative_path} → {output_path}")
+        except Exception as e:
+            self.log(f"❌ Error processing {relative_path}: {e}")
+        finally:
+            with self._lock:
+                self.in_progress.discard(path)
+
+    def run(self):
+        """Watches until stop() is called or the process is interrupted"""
+        # Al arrancar se encolan los archivos nuevos o cambiados desde la última ejecución
+        for path in self.index.scan(self.data_dir):
+            self.notify(path)
+        self.index.save()
+
+        observer = None
+        if WATCHDOG_AVAILABLE:
+            observer = Observer()
+            observer.schedule(_EventHandler(self), self.data_dir, recursive=True)
+            observer.start()
+            self.log(f"👀 Watching {self.data_dir} (inotify)")
+        else:
+            self.log(f"👀 Watching {self.data_dir} (polling every {self.poll_interval:g}s, "
+                     f"install watchdog for inotify)")
+
+        last_poll = time.monotonic()
+        try:
+            while not self._stop.is_set():
+                if observer is None and time.monotonic() - last_poll >= self.poll_interval:
+                    self._poll()
+                    last_poll = time.monotonic()
+                self._settle()
+                self._stop.wait(0.5)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            if observer is not None:
+                observer.stop()
+                observer.join()
+            self.executor.shutdown(wait=True)
+            self.index.save()
+
+    def stop(self):
+        self._stop.set()
@@ -0,0 +1,107 @@
+import os
+
+import pandas as pd
+import pytest
+
+pytest.importorskip("polars")
+
+from modules import cleaner
+from modules.cleaner import check_backend_parity, strategies_dict
+from modules.detector import detect
+
+DATA_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                         "data", "dirty_cafe_sales.csv")
+
+# Cada caso es una lista de (estrategia, columna) sobre dirty_cafe_sales.csv
+CATALOGUE = [
+    [("fill_with_mode", "Item"), ("fill_with_mode", "Location")],
+    [("remove_null_rows", "Payment Method")],
+    [("remove_duplicates", "Item")],
+    [("flag_duplicates", "Location")],
+    [("convert_to_lowercase", "Item"), ("convert_to_uppercase", "Payment Method")],
+    [("title_case", "Location")],
+    [("remove_spaces", "Item"), ("normalize_characters", "Location")],
+    [("convert_to_numeric_float", "Quantity"), ("fill_with_median", "Quantity")],
+    [("convert_to_numeric_float", "Price Per Unit"), ("fill_with_mean", "Price Per Unit")],
+    [("convert_to_numeric_float", "Total Spent"), ("fill_with_zero", "Total Spent")],
+    [("convert_to_numeric_int", "Quantity"), ("fill_with_mean", "Quantity")],
+    [("convert_to_numeric_int", "Quantity"), ("fill_with_median", "Quantity")],
+    [("convert_to_date", "Transaction Date")],
+    [("convert_to_string", "Transaction ID")],
+    [("convert_to_numeric_float", "Total Spent"), ("remove_outliers", "Total Spent")],
+    [("convert_to_numeric_float", "Total Spent"), ("winsorize", "Total Spent")],
+    [("convert_to_numeric_float", "Total Spent"), ("get_outliers", "Total Spent")],
+    # Un paso inválido se omite en los dos backends y el resto se aplica
+    [("fill_with_median", "Item"), ("convert_to_numeric_float", "Quantity")],
+    [("remove_outliers", "Payment Method"), ("fill_with_mode", "Payment Method")],
+]
+
+
+# Columnas ya tipadas: enteros, floats con nulos, fechas y texto
+TYPED_CATALOGUE = [
+    [("winsorize", "units")],
+    [("winsorize", "price")],
+    [("remove_outliers", "units"), ("get_outliers", "price")],
+    [("fill_with_median", "price"), ("fill_with_mean", "units")],
+    [("fill_with_mean", "price"), ("fill_with_mode", "units")],
+    [("fill_with_zero", "price"), ("convert_to_numeric_int", "price")],
+    [("convert_to_numeric_float", "units"), ("convert_to_string", "units")],
+    [("remove_duplicates", "units"), ("flag_duplicates", "price")],
+    [("convert_to_date", "when"), ("remove_null_rows", "price")],
+    [("convert_to_lowercase", "name"), ("convert_to_date", "day"), ("winsorize", "units")],
+]
+
+
+def as_strategies(operations):
+    return [{"column": column, "problem": "", "strategy": strategy, "parameters": {}, "reason": ""}
+            for strategy, column in operations]
+
+
+@pytest.fixture(autouse=True)
+def no_sleep(monkeypatch):
+    monkeypatch.setattr(cleaner.time, "sleep", lambda *_: None)
+
+
+@pytest.fixture(scope="module")
+def cafe_df():
+    _, df = detect(DATA_PATH)
+    return df
+
+
+@pytest.fixture
+def typed_df():
+    return pd.DataFrame({
+        "units": [1, 5, 2, 100, 3, 5, 4, 2],
+        "price": [1.5, None, 2.25, 80.0, 2.25, 3.0, None, 2.5],
+        "when": pd.to_datetime(["2023-01-01", None, "2023-01-03", "2023-01-04",
+                                "2023-01-05", "2023-01-06", "2023-01-07", "2023-01-08"]),
+        "day": ["2023-01-01", "01/02/2023", None, "x", "2023-01-05", "2023-01-06", "2023-01-07", "2023-01-08"],
+        "name": ["A", "b", None, "C", "a", "B", "c", "A"],
+    })
+
+
+def test_catalogue_covers_every_strategy():
+    covered = {strategy for operations in CATALOGUE for strategy, _ in operations}
+    assert covered == set(strategies_dict)
+
+
+@pytest.mark.parametrize("operations", CATALOGUE, ids=lambda ops: "+".join(s for s, _ in ops))
+def test_backends_match(cafe_df, operations):
+    report = check_backend_parity(as_strategies(operations), cafe_df)
+    assert report == {"pandas": None, "polars": None}
+
+
+@pytest.mark.parametrize("operations", TYPED_CATALOGUE, ids=lambda ops: "+".join(s for s, _ in ops))
+def test_backends_match_on_typed_columns(typed_df, operations):
+    report = check_backend_parity(as_strategies(operations), typed_df)
+    assert report == {"pandas": None, "polars": None}
+
+
+@pytest.mark.parametrize("values", [
+    ["2023-1-5 10:00", "2023-01-06", "01/02/2023", None, "junk", "5 Jan 2023"],
+    ["2023-01-05T10:00:00+02:00", "2023-01-06T10:00:00+03:00", None],
+])
+def test_date_parsing_matches(values):
+    df = pd.DataFrame({"date": values})
+    report = check_backend_parity(as_strategies([("convert_to_date", "date")]), df)
+    assert report == {"pandas": None, "polars": None}
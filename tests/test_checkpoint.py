@@ -0,0 +1,59 @@
+import os
+
+import pandas as pd
+import pytest
+
+from modules import checkpoint as checkpoint_module
+from modules import cleaner
+from modules.checkpoint import CheckpointRun
+from modules.cleaner import apply_pandas
+
+
+@pytest.fixture(autouse=True)
+def no_sleep(monkeypatch):
+    monkeypatch.setattr(cleaner.time, "sleep", lambda *_: None)
+
+
+def test_mixed_object_column_is_checkpointed(tmp_path):
+    df = pd.DataFrame({"name": ["a", None, "c"], "qty": ["1", "x", "3"]})
+    operations = [("fill_with_zero", "name"), ("convert_to_numeric_float", "qty")]
+    run = CheckpointRun.create(str(tmp_path), "data.csv", [], operations, df, every=1)
+
+    clean = apply_pandas(operations, df.copy(), checkpoint=run)
+
+    assert run.completed == 2 and run.manifest["finished"]
+    restored, reached = run.restore()
+    assert reached == 2
+    pd.testing.assert_frame_equal(restored, clean)
+
+
+def test_failed_checkpoint_does_not_stop_cleaning(tmp_path, monkeypatch):
+    df = pd.DataFrame({"name": ["a", None, "c"], "qty": ["1", "x", "3"]})
+    operations = [("fill_with_mode", "name"), ("convert_to_numeric_float", "qty")]
+    run = CheckpointRun.create(str(tmp_path), "data.csv", [], operations, df, every=1)
+
+    write_frame = checkpoint_module._write_frame
+
+    def failing_first_step(frame, path_without_ext):
+        if os.path.basename(path_without_ext) == "step_0001":
+            raise OSError("disk full")
+        return write_frame(frame, path_without_ext)
+
+    monkeypatch.setattr(checkpoint_module, "_write_frame", failing_first_step)
+    clean = apply_pandas(operations, df.copy(), checkpoint=run)
+
+    assert [c["completed"] for c in run.manifest["checkpoints"]] == [2]
+    restored, _ = run.restore()
+    pd.testing.assert_frame_equal(restored, clean)
+
+
+def test_prune_keeps_only_recent_unfinished_runs(tmp_path):
+    df = pd.DataFrame({"a": [1, 2]})
+    operations = [("fill_with_zero", "a")]
+    # Nombres en orden inverso a la fecha: la poda no puede fiarse del orden alfabético
+    runs = [CheckpointRun.create(str(tmp_path), f"run{9 - i}.csv", [], operations, df) for i in range(4)]
+    runs[1].finish()
+    runs[3].finish()
+
+    assert checkpoint_module.prune_runs(str(tmp_path), keep_unfinished=1) == 3
+    assert os.listdir(tmp_path) == [os.path.basename(runs[2].run_dir)]
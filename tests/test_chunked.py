@@ -0,0 +1,82 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from modules import chunked
+from modules.cleaner import strategies_dict
+from modules.chunked import stream_clean
+
+DATA_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                         "data", "dirty_cafe_sales.csv")
+
+
+def clean_in_memory(operations):
+    df = pd.read_csv(DATA_PATH)
+    for strategy_name, column in operations:
+        try:
+            df = strategies_dict[strategy_name](df, column)
+        except Exception:
+            pass
+    return df
+
+
+def clean_in_chunks(tmp_path, operations, chunksize=1000):
+    output_path = str(tmp_path / "clean.csv")
+    rows, _ = stream_clean(DATA_PATH, operations, output_path, chunksize=chunksize)
+    assert os.listdir(tmp_path) == ["clean.csv"]
+    result = pd.read_csv(output_path)
+    assert len(result) == rows
+    return result
+
+
+@pytest.mark.parametrize("operations", [
+    [("convert_to_numeric_float", "Quantity"), ("fill_with_median", "Quantity"),
+     ("fill_with_mode", "Item"), ("remove_duplicates", "Transaction ID")],
+    # Operaciones que fallan: se omiten y el resto del plan se aplica
+    [("fill_with_mean", "Item"), ("fill_with_mode", "Location")],
+    [("convert_to_numeric_int", "Quantity"), ("fill_with_mean", "Quantity"),
+     ("fill_with_mode", "Payment Method")],
+    [("flag_duplicates", "Item")],
+    [("flag_duplicates", "Transaction ID")],
+])
+def test_chunked_matches_in_memory(tmp_path, operations):
+    expected = clean_in_memory(operations)
+    expected = pd.read_csv(pd.io.common.StringIO(expected.to_csv(index=False)))
+    pd.testing.assert_frame_equal(clean_in_chunks(tmp_path, operations), expected)
+
+
+def test_small_chunks_match_whole_file(tmp_path):
+    # Con chunks de 2 filas cada chunk inferiría sus propios formatos y tipos
+    input_path = str(tmp_path / "input.csv")
+    pd.DataFrame({
+        "day": ["01/02/2023", "03/04/2023", "25/12/2023", "01/02/2023", None, "07/08/2023"],
+        "stamp": ["2023-01-05 10:00", "2023-01-05T10:00:00+02:00", None, "2023-01-06", "x", "2023-01-07"],
+        "q": ["1", "2", "3", "ERROR", None, "5"],
+        "n": [1, 2, 3, 4, None, 6],
+    }).to_csv(input_path, index=False)
+    operations = [("convert_to_date", "day"), ("convert_to_date", "stamp")]
+
+    expected = pd.read_csv(input_path)
+    for strategy_name, column in operations:
+        expected = strategies_dict[strategy_name](expected, column)
+    output_path = str(tmp_path / "clean.csv")
+    stream_clean(input_path, operations, output_path, chunksize=2)
+
+    with open(output_path) as f:
+        assert f.read() == expected.to_csv(index=False)
+
+
+def test_fitting_memory_is_bounded(tmp_path, monkeypatch):
+    monkeypatch.setattr(chunked, "MAX_TRACKED_VALUES", 50)
+    values = pd.Series(np.random.default_rng(0).normal(100, 15, 20_000)).round(3)
+    values[::10] = np.nan
+    input_path = str(tmp_path / "values.csv")
+    pd.DataFrame({"value": values}).to_csv(input_path, index=False)
+
+    accumulator = None
+    for chunk in pd.read_csv(input_path, chunksize=1000):
+        accumulator = chunked._accumulate(accumulator, "fill_with_median", chunk["value"])
+        assert len(accumulator) <= 2 * chunked.MAX_TRACKED_VALUES
+    assert abs(chunked._finalize("fill_with_median", accumulator) - values.median()) < 1
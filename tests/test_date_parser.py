@@ -0,0 +1,44 @@
+import pandas as pd
+
+from modules.date_parser import format_report, last_parse_reports, parse_dates
+
+
+def test_all_null_column_is_all_nat():
+    result, report = parse_dates(pd.Series([None, None], dtype=object))
+    assert result.isna().all() and pd.api.types.is_datetime64_any_dtype(result)
+    assert report["total"] == 0 and report["parse_rate"] == 1.0
+
+
+def test_iso_dates_use_the_fast_path():
+    result, report = parse_dates(pd.Series(["2023-01-05", "2023-12-31", None]))
+    assert result.tolist()[:2] == [pd.Timestamp("2023-01-05"), pd.Timestamp("2023-12-31")]
+    assert pd.isna(result.iloc[2])
+    assert report["formats"] == ["%Y-%m-%d"] and report["slow_path_values"] == 0
+
+
+def test_mixed_formats_and_junk():
+    series = pd.Series(["2023-01-05", "01/06/2023", "7 Jan 2023", "junk", "01/06/2023"])
+    result, report = parse_dates(series, column="date")
+    assert result.iloc[:3].tolist() == [pd.Timestamp(f"2023-01-0{day}") for day in (5, 6, 7)]
+    assert pd.isna(result.iloc[3]) and result.iloc[4] == result.iloc[1]
+    assert (report["total"], report["parsed"], report["parse_rate"]) == (5, 4, 0.8)
+    assert last_parse_reports["date"] == report
+    assert format_report(report).startswith("4/5 parsed (80.0%)")
+
+
+def test_offsets_become_utc():
+    result, _ = parse_dates(pd.Series(["2023-01-05T10:00:00+02:00", "2023-01-05T10:00:00+03:00"]))
+    assert str(result.dt.tz) == "UTC"
+    assert result.tolist() == [pd.Timestamp("2023-01-05 08:00", tz="UTC"), pd.Timestamp("2023-01-05 07:00", tz="UTC")]
+
+
+def test_ambiguous_order_is_month_first_like_pandas():
+    series = pd.Series(["01/02/2023", "03/04/2023"])
+    result, _ = parse_dates(series)
+    assert result.tolist() == pd.to_datetime(series).tolist()
+    assert result.tolist() == [pd.Timestamp("2023-01-02"), pd.Timestamp("2023-03-04")]
+
+    # Un día mayor que 12 decide el orden de toda la columna
+    result, report = parse_dates(pd.Series(["01/02/2023", "25/12/2023"]))
+    assert report["formats"] == ["%d/%m/%Y"]
+    assert result.tolist() == [pd.Timestamp("2023-02-01"), pd.Timestamp("2023-12-25")]
@@ -0,0 +1,61 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from modules import dedup_index
+from modules.dedup_index import DedupIndex, hash_keys
+from modules.toolset import flag_duplicates, remove_duplicates
+
+
+@pytest.fixture
+def history(tmp_path):
+    dedup_index.set_index_dir(str(tmp_path / "indexes"))
+    yield
+    dedup_index.set_index_dir(None)
+
+
+def test_integral_floats_hash_like_ints():
+    ints = pd.DataFrame({"id": [1, 2, 3]})
+    floats = pd.DataFrame({"id": [1.0, 2.0, np.nan]})
+    text = pd.DataFrame({"id": ["1", "2", "3"]})
+    assert (hash_keys(ints, ["id"])[:2] == hash_keys(floats, ["id"])[:2]).all()
+    assert (hash_keys(ints, ["id"]) == hash_keys(text, ["id"])).all()
+    assert hash_keys(pd.DataFrame({"id": [1.5]}), ["id"])[0] != hash_keys(pd.DataFrame({"id": [1]}), ["id"])[0]
+
+
+def test_first_seen_ignores_null_keys_across_batches(tmp_path):
+    index = DedupIndex(str(tmp_path))
+    first = pd.DataFrame({"id": [1, None, None]})
+    assert index.first_seen(first, ["id"]).tolist() == [True, True, False]
+    index.commit()
+    second = pd.DataFrame({"id": [None, 1.0, 2.0]})
+    assert index.first_seen(second, ["id"], include_staged=False).tolist() == [True, False, True]
+
+
+def test_history_keeps_null_keys(history):
+    remove_duplicates(pd.DataFrame({"id": [1, None]}), "id")
+    dedup_index.commit_persistent_indexes()
+
+    kept = remove_duplicates(pd.DataFrame({"id": [None, 1.0, 3.0]}), "id")
+    assert kept["id"].isna().tolist() == [True, False]
+    assert kept["id"].iloc[1] == 3.0
+
+    flagged = flag_duplicates(pd.DataFrame({"id": [None, 1.0, 4.0]}), "id")
+    assert flagged["es_duplicado"].tolist() == [False, True, False]
+
+
+def test_keys_sharing_half_a_hash_are_distinct(tmp_path):
+    index = DedupIndex(str(tmp_path))
+    stored = np.array([(7, 1)], dtype=dedup_index.KEY_DTYPE)
+    index.stage(stored)
+    index.commit()
+    probe = np.array([(7, 1), (7, 2), (8, 1)], dtype=dedup_index.KEY_DTYPE)
+    assert index.contains(probe).tolist() == [True, False, False]
+    assert index.first_seen(pd.DataFrame({"id": []}), ["id"]).tolist() == []
+
+
+def test_old_64_bit_index_is_rejected(tmp_path):
+    index = DedupIndex(str(tmp_path))
+    np.save(index._file("part", 0), np.array([1, 2], dtype=np.uint64))
+    with pytest.raises(ValueError, match="64-bit"):
+        index.contains(np.zeros(1, dtype=dedup_index.KEY_DTYPE))
@@ -0,0 +1,52 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from modules import memory_governor
+from modules.memory_governor import downcast, plan_run, set_memory_budget
+
+
+@pytest.fixture
+def restore_budget():
+    budget = memory_governor.memory_budget_mb
+    yield
+    set_memory_budget(budget)
+
+
+def test_downcast_round_trips_losslessly():
+    original = pd.DataFrame({
+        "small": np.array([1, 2, 3], dtype="int64"),
+        "big": np.array([1, 2, 2 ** 40], dtype="int64"),
+        "nullable": pd.array([1, None, 300], dtype="Int64"),
+        "halves": [0.5, 1.25, None],
+        "precise": [0.1, 0.2, 0.3],
+        "text": ["a", "b", "c"],
+    })
+    df, report = downcast(original.copy())
+
+    assert str(df["small"].dtype) == "int8"
+    assert str(df["big"].dtype) == "int64"
+    assert str(df["nullable"].dtype) == "Int16"
+    assert str(df["halves"].dtype) == "float32"
+    # 0.1 no es exacto en float32: se queda en float64
+    assert str(df["precise"].dtype) == "float64"
+    assert report["small"][2:] == ("int64", "int8") and report["small"][1] < report["small"][0]
+
+    for column in original.columns:
+        restored = df[column].astype(original[column].dtype)
+        pd.testing.assert_series_equal(restored, original[column])
+
+
+def test_budget_switches_to_chunks(tmp_path, restore_budget):
+    path = tmp_path / "data.csv"
+    pd.DataFrame({"a": np.arange(50_000), "b": ["text value"] * 50_000}).to_csv(path, index=False)
+
+    set_memory_budget(1024)
+    plan = plan_run(str(path))
+    assert plan["chunked"] is False and plan["chunksize"] is None
+
+    set_memory_budget(1)
+    plan = plan_run(str(path))
+    assert plan["chunked"] is True
+    assert plan["projected_bytes"] > plan["budget_bytes"] == 1024 * 1024
+    assert plan["chunksize"] >= 1_000
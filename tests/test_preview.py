@@ -0,0 +1,72 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from modules.preview import REPORT_LISTS, compare_results, sample_csv, wilson_interval
+
+
+@pytest.fixture
+def big_csv(tmp_path):
+    rng = np.random.default_rng(0)
+    rows = 20_000
+    df = pd.DataFrame({
+        "id": np.arange(rows),
+        "value": rng.normal(50, 10, rows).round(2),
+        "label": rng.choice(["x", "y", "z"], rows),
+    })
+    path = tmp_path / "big.csv"
+    df.to_csv(path, index=False)
+    return str(path), df
+
+
+def test_small_file_is_read_whole(tmp_path):
+    path = tmp_path / "small.csv"
+    path.write_text("a,b\n1,x\n2,y\n")
+    sample, rows = sample_csv(str(path))
+    assert rows == 2 and sample["a"].tolist() == [1, 2]
+
+
+def test_sample_covers_the_whole_file(big_csv):
+    path, df = big_csv
+    sample, estimated_rows = sample_csv(path, blocks=16, block_bytes=2048, seed=1)
+    assert list(sample.columns) == list(df.columns)
+    assert 0 < len(sample) < len(df)
+    assert abs(estimated_rows - len(df)) / len(df) < 0.05
+    # Un bloque por estrato: hay filas del principio y del final
+    assert sample["id"].min() < len(df) / 16 and sample["id"].max() > len(df) * 15 / 16
+    # Solo líneas completas
+    assert sample.merge(df, on=list(df.columns)).shape[0] == len(sample)
+    sample_again, _ = sample_csv(path, blocks=16, block_bytes=2048, seed=1)
+    pd.testing.assert_frame_equal(sample, sample_again)
+
+
+def test_wilson_interval():
+    assert wilson_interval(0, 0) == (0.0, 1.0)
+    lower, upper = wilson_interval(0, 100)
+    assert lower == 0.0 and 0 < upper < 0.05
+    lower, upper = wilson_interval(50, 100)
+    assert lower < 0.5 < upper and np.isclose(0.5 - lower, upper - 0.5)
+    # Más muestra, intervalo más estrecho
+    narrow = wilson_interval(500, 1000)
+    assert narrow[1] - narrow[0] < upper - lower
+
+
+def analysis(null_rate, strategies=None, **lists):
+    report = {key: lists.get(key, []) for key in REPORT_LISTS}
+    return {"report": report, "metrics": {"null_rate": {"a": null_rate}, "outlier_rate": {}},
+            "strategies": strategies}
+
+
+def test_compare_results():
+    preview = analysis((0.1, 0.05, 0.15), [{"column": "a", "strategy": "fill_with_mode"}],
+                       columns_with_na=["a"])
+    assert compare_results(preview, analysis((0.12, 0.1, 0.14), [{"column": "a", "strategy": "fill_with_mode"}],
+                                             columns_with_na=["a"])) == []
+
+    full = analysis((0.3, 0.28, 0.32), [{"column": "a", "strategy": "fill_with_median"}],
+                    columns_with_na=["a", "b"])
+    disagreements = compare_results(preview, full)
+    assert len(disagreements) == 4
+    assert any("null_rate of a" in line for line in disagreements)
+    assert any("columns_with_na" in line and "'b'" in line for line in disagreements)
+    assert compare_results(preview, dict(full, strategies=None))[-1].startswith("null_rate")
@@ -0,0 +1,37 @@
+import pandas as pd
+
+from modules import LeMistral_client
+from modules.detector import detect_dataframe
+from modules.rule_engine import DEFAULT_POLICY, generate_strategies
+
+
+def plan_for(df, **overrides):
+    return generate_strategies(detect_dataframe(df), dict(DEFAULT_POLICY, **overrides))
+
+
+def steps(strategies):
+    return [(strategy["strategy"], strategy["column"]) for strategy in strategies]
+
+
+def test_identifier_columns_are_not_converted():
+    ids = [str(i) for i in range(100)]
+    df = pd.DataFrame({
+        "id": ids,
+        "order_ref": ids[:99] + ["ERROR"],
+        "ticket": [str(i) for i in range(99)] + ["ERROR"],
+        "price": [f"{i}.5" for i in range(99)] + ["ERROR"],
+    })
+    strategies, _ = plan_for(df)
+    conversions = {column for strategy, column in steps(strategies) if strategy.startswith("convert_to")}
+    assert conversions == {"price"}
+
+
+def test_escalated_columns_drop_rule_steps(monkeypatch):
+    df = pd.DataFrame({"city": [" Paris", "paris", "Rome", None] * 10})
+    strategies, ambiguous = plan_for(df)
+    assert "city" in ambiguous and ("remove_spaces", "city") in steps(strategies)
+
+    mistral_steps = [{"column": "city", "problem": "", "strategy": "title_case", "parameters": {}, "reason": ""}]
+    monkeypatch.setattr(LeMistral_client, "planner", "rules")
+    monkeypatch.setattr(LeMistral_client, "request_strategies", lambda *_: mistral_steps)
+    assert steps(LeMistral_client.get_strategies(detect_dataframe(df))) == [("title_case", "city")]
@@ -0,0 +1,101 @@
+import json
+import os
+import shutil
+import threading
+import urllib.error
+import urllib.request
+from http.server import ThreadingHTTPServer
+
+import pytest
+
+from modules import cleaner, service
+from modules.detector import detect
+from modules.service import KodyService, TOKEN_HEADER, make_handler
+
+DATA_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                         "data", "dirty_cafe_sales.csv")
+STRATEGIES = [{"column": "Item", "problem": "", "strategy": "fill_with_mode", "parameters": {}, "reason": ""}]
+
+
+@pytest.fixture(autouse=True)
+def no_sleep(monkeypatch):
+    monkeypatch.setattr(cleaner.time, "sleep", lambda *_: None)
+
+
+@pytest.fixture
+def kody(tmp_path):
+    data_dir = tmp_path / "data"
+    data_dir.mkdir()
+    shutil.copy(DATA_PATH, data_dir / "cafe.csv")
+    kody = KodyService(str(tmp_path / "outputs"), str(data_dir), workers=1)
+    yield kody
+    kody.executor.shutdown()
+
+
+@pytest.fixture
+def server(kody):
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), make_handler(kody, "secret"))
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def post(url, body, headers):
+    request = urllib.request.Request(url, data=json.dumps(body).encode(), method="POST", headers=headers)
+    try:
+        with urllib.request.urlopen(request) as response:
+            return response.status, json.loads(response.read())
+    except urllib.error.HTTPError as e:
+        return e.code, json.loads(e.read())
+
+
+def test_paths_are_confined(kody, tmp_path):
+    result = kody.apply("cafe.csv", "clean.csv", strategies=STRATEGIES)
+    assert result["output_path"] == str(tmp_path / "outputs" / "clean.csv")
+    with pytest.raises(ValueError):
+        kody.submit("apply", {"csv_path": DATA_PATH, "strategies": STRATEGIES})
+    with pytest.raises(ValueError):
+        kody.submit("apply", {"csv_path": "cafe.csv", "output_path": "../escaped.csv", "strategies": STRATEGIES})
+    assert not (tmp_path / "escaped.csv").exists()
+
+
+def test_requests_need_token_and_json(server):
+    body = {"op": "detect", "csv_path": "cafe.csv", "wait": True}
+    assert post(f"{server}/jobs", body, {"Content-Type": "application/json"})[0] == 401
+    assert post(f"{server}/jobs", body, {"Content-Type": "text/plain", TOKEN_HEADER: "secret"})[0] == 415
+    status, job = post(f"{server}/jobs", body, {"Content-Type": "application/json", TOKEN_HEADER: "secret"})
+    assert status == 200 and job["status"] == "done"
+
+
+def test_body_must_be_a_json_object(server):
+    headers = {"Content-Type": "application/json", TOKEN_HEADER: "secret"}
+    for body in ("x", [1, 2], None):
+        status, error = post(f"{server}/jobs", body, headers)
+        assert status == 400 and "JSON object" in error["error"]
+
+
+def test_detect_matches_the_repl_loader(kody, tmp_path):
+    # Con columnas numéricas el REPL reduce los tipos antes de detectar
+    csv_path = tmp_path / "data" / "numbers.csv"
+    csv_path.write_text("units,price\n1,2.5\n2,\n300,4.25\n2,1.0\n")
+    report_json, _ = detect(str(csv_path))
+    assert kody.detect("numbers.csv") == json.loads(report_json)
+
+
+def test_caches_are_bounded(kody, tmp_path, monkeypatch):
+    monkeypatch.setattr(service, "MAX_DATASETS", 2)
+    monkeypatch.setattr(service, "MAX_CLEAN_RESULTS", 1)
+    monkeypatch.setattr(service, "MAX_FINISHED_JOBS", 2)
+    for name in ("a.csv", "b.csv", "c.csv"):
+        shutil.copy(DATA_PATH, tmp_path / "data" / name)
+        kody.detect(name)
+    assert [os.path.basename(path) for path in kody.datasets] == ["b.csv", "c.csv"]
+
+    kody.apply("c.csv", "one.csv", strategies=STRATEGIES)
+    kody.apply("c.csv", "two.csv", strategies=STRATEGIES + [dict(STRATEGIES[0], column="Location")])
+    assert len(kody.datasets[str(tmp_path / "data" / "c.csv")]["clean"]) == 1
+
+    for _ in range(4):
+        kody.job(kody.submit("detect", {"csv_path": "c.csv"}), wait=True)
+    assert len(kody.jobs) <= 3
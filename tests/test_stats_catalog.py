@@ -0,0 +1,46 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from modules import toolset
+from modules.stats_catalog import get_catalog
+
+
+@pytest.fixture
+def df():
+    return pd.DataFrame({
+        "qty": [1.0, None, 3.0, 100.0, 3.0],
+        "units": [5, 1, 2, 2, 9],
+        "when": pd.to_datetime(["2023-01-01", None, "2023-03-01", "2023-01-15", "2023-02-01"]),
+        "name": ["a", None, "b", "a", "c"],
+    })
+
+
+def test_catalog_is_fresh_after_a_transform(df):
+    catalog = get_catalog(df)
+    assert catalog.null_count("qty") == 1
+    assert catalog.median("qty") == 3.0
+
+    df = toolset.fill_with_zero(df, "qty")
+    assert get_catalog(df) is catalog
+    assert catalog.null_count("qty") == 0
+    assert catalog.median("qty") == 3.0
+    assert catalog.mean("qty") == df["qty"].mean()
+
+    df = toolset.fill_with_mode(df, "name")
+    assert catalog.null_count("name") == 0
+    assert catalog.value_counts("name").equals(df["name"].value_counts())
+
+
+def test_describe_equals_pandas(df):
+    pd.testing.assert_frame_equal(get_catalog(df).describe(), df.describe())
+    numeric_only = df[["qty", "units"]]
+    pd.testing.assert_frame_equal(get_catalog(numeric_only).describe(), numeric_only.describe())
+    text_only = df[["name"]]
+    pd.testing.assert_frame_equal(get_catalog(text_only).describe(), text_only.describe())
+
+
+def test_quantiles_match_pandas(df):
+    catalog = get_catalog(df)
+    for q in (0.05, 0.25, 0.5, 0.75, 0.95):
+        assert np.isclose(catalog.quantile("units", q), df["units"].quantile(q))
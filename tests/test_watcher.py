@@ -0,0 +1,49 @@
+import os
+import threading
+import time
+
+from modules import watcher
+from modules.watcher import DataWatcher, FileIndex
+
+
+def wait_for(condition, timeout=10):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.05)
+
+
+def test_polling_processes_files_added_after_start(tmp_path, monkeypatch):
+    monkeypatch.setattr(watcher, "WATCHDOG_AVAILABLE", False)
+    data_dir = tmp_path / "data"
+    data_dir.mkdir()
+    (data_dir / "first.csv").write_text("a\n1\n")
+
+    processed = []
+    data_watcher = DataWatcher(str(data_dir), str(tmp_path / "outputs"), FileIndex(str(tmp_path / "index.json")),
+                               settle_seconds=0, poll_interval=0.1, log=lambda *_: None,
+                               process_fn=lambda path, _: processed.append(os.path.basename(path)) or path)
+    thread = threading.Thread(target=data_watcher.run)
+    thread.start()
+    try:
+        wait_for(lambda: processed == ["first.csv"])
+        (data_dir / "nested").mkdir()
+        (data_dir / "nested" / "second.csv").write_text("a\n2\n")
+        (data_dir / "third.csv").write_text("a\n3\n")
+        wait_for(lambda: sorted(processed) == ["first.csv", "second.csv", "third.csv"])
+    finally:
+        data_watcher.stop()
+        thread.join()
+
+
+def test_size_is_current_after_in_place_edit(tmp_path):
+    csv_path = tmp_path / "data.csv"
+    csv_path.write_text("a\n1\n")
+    index = FileIndex(str(tmp_path / "index.json"))
+    assert index.scan(str(tmp_path)) == [str(csv_path)]
+    assert index.size(str(csv_path)) == 4
+
+    # Reescribir el archivo no cambia el mtime del directorio: el listado sale de la caché
+    csv_path.write_text("a\n1\n2\n3\n")
+    assert index.scan(str(tmp_path)) == [str(csv_path)]
+    assert index.size(str(csv_path)) == 8